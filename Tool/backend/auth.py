@@ -1,8 +1,17 @@
 from fastapi import Security, HTTPException, status
 from fastapi.security import OAuth2AuthorizationCodeBearer
+import base64
+import hashlib
+import json
+import logging
 import os
+import threading
+import time
+import requests
 
-# For a real implementation, we would use python-jose to decode 
+logger = logging.getLogger(__name__)
+
+# For a real implementation, we would use python-jose to decode
 # the JWT and verify it against https://login.microsoftonline.com/{tenant_id}/discovery/v2.0/keys
 # For MVP, we will assume a middleware or basic validation.
 
@@ -11,20 +20,127 @@ oauth2_scheme = OAuth2AuthorizationCodeBearer(
     tokenUrl=f"https://login.microsoftonline.com/{os.getenv('AZURE_TENANT_ID')}/oauth2/v2.0/token",
 )
 
-def validate_token(token: str = Security(oauth2_scheme)):
+JWKS_URL = f"https://login.microsoftonline.com/{os.getenv('AZURE_TENANT_ID')}/discovery/v2.0/keys"
+
+# Signing keys rotate rarely, so the discovery document is only re-fetched
+# when an unseen `kid` shows up, and at most once per refresh interval.
+JWKS_MIN_REFRESH_INTERVAL = 60
+_jwks_cache: dict = {}
+_jwks_lock = threading.Lock()
+_jwks_last_fetch = 0.0
+_jwks_fetching = False
+
+# Validated claims, keyed by a digest of the token (never the raw JWT).
+# Entries live until the token's own `exp` or the TTL, whichever comes first.
+TOKEN_CACHE_TTL = 300
+TOKEN_CACHE_MAX_SIZE = 10000
+_token_cache: dict = {}
+_token_cache_lock = threading.Lock()
+
+def _token_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+def _fetch_jwks() -> dict:
+    resp = requests.get(JWKS_URL, timeout=10)
+    resp.raise_for_status()
+    return {k["kid"]: k for k in resp.json().get("keys", []) if "kid" in k}
+
+def get_signing_key(kid: str):
+    """
+    Returns the JWK for the given key id from the process-wide cache.
+    Returns None if the key is unknown even after a refresh.
+    """
+    global _jwks_last_fetch, _jwks_fetching
+    key = _jwks_cache.get(kid)
+    if key or not os.getenv("AZURE_TENANT_ID"):
+        return key
+
+    with _jwks_lock:
+        # Another request may have refreshed while we waited
+        key = _jwks_cache.get(kid)
+        if key:
+            return key
+        if _jwks_fetching or time.time() - _jwks_last_fetch < JWKS_MIN_REFRESH_INTERVAL:
+            return None
+        _jwks_fetching = True
+
+    # Fetched outside the lock so other requests aren't held up behind the network call
+    keys = None
+    try:
+        keys = _fetch_jwks()
+    except Exception as e:
+        logger.error(f"JWKS refresh failed: {e}")
+    finally:
+        with _jwks_lock:
+            _jwks_fetching = False
+            # Only a successful fetch starts the refresh interval
+            if keys is not None:
+                _jwks_cache.update(keys)
+                _jwks_last_fetch = time.time()
+    return _jwks_cache.get(kid)
+
+def _unverified_header(token: str) -> dict:
+    try:
+        header = token.split(".", 1)[0]
+        header += "=" * (-len(header) % 4)
+        parsed = json.loads(base64.urlsafe_b64decode(header))
+    except ValueError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+def _decode_token(token: str) -> dict:
     """
     Placeholder for Azure AD Token Validation.
     In production, verify signature, audience, and issuer.
     """
+    kid = _unverified_header(token).get("kid")
+    # Signatures aren't verified yet, so an unknown key is only logged, not rejected
+    if kid and not get_signing_key(kid):
+        logger.warning(f"Token signed with unknown key id {kid}")
+
+    # Mock user for now
+    return {
+        "sub": "mock_user_id",
+        "name": "Mock Administrator",
+        "roles": ["Reader"]
+    }
+
+def _cache_claims(key: bytes, claims: dict, now: float):
+    expires_at = now + TOKEN_CACHE_TTL
+    if claims.get("exp"):
+        expires_at = min(expires_at, float(claims["exp"]))
+
+    with _token_cache_lock:
+        if len(_token_cache) >= TOKEN_CACHE_MAX_SIZE:
+            # Drop expired entries first, then the oldest insertions
+            for k in [k for k, (_, exp) in _token_cache.items() if exp <= now]:
+                del _token_cache[k]
+            while len(_token_cache) >= TOKEN_CACHE_MAX_SIZE:
+                del _token_cache[next(iter(_token_cache))]
+        _token_cache[key] = (claims, expires_at)
+
+def validate_token(token: str = Security(oauth2_scheme)):
+    """
+    Validates the bearer token and returns its claims.
+    Results are cached per token so repeat requests skip signature verification.
+    """
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    # Mock user for now
-    return {
-        "sub": "mock_user_id",
-        "name": "Mock Administrator",
-        "roles": ["Reader"] 
-    }
+
+    key = _token_key(token)
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+        if cached:
+            claims, expires_at = cached
+            if expires_at > now:
+                return claims
+            del _token_cache[key]
+
+    claims = _decode_token(token)
+    _cache_claims(key, claims, now)
+    return claims
@@ -1,14 +1,38 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
+import orjson
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./dev.db")
 
+# Request handlers and background jobs each hold a session, so the default
+# 5+10 pool is too small. Pre-ping drops connections the server has closed.
+POOL_OPTIONS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+}
+
+def _json_serializer(value) -> str:
+    # JSON columns hold whole inventory snapshots; orjson encodes them far
+    # faster than the stdlib encoder SQLAlchemy uses by default.
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+_url = make_url(DATABASE_URL)
+# In-memory SQLite uses a single-connection pool that takes no sizing options
+_in_memory = _url.get_backend_name() == "sqlite" and _url.database in (None, "", ":memory:")
+
 engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
+    DATABASE_URL,
+    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    **({} if _in_memory else POOL_OPTIONS)
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -1,26 +1,36 @@
 import os
 import logging
+import asyncio
+import csv
 import io
 import json
+import re
+import threading
+import time
+import orjson
 from contextlib import contextmanager
 from typing import Optional, List, Dict, Any
 import concurrent.futures
+from functools import lru_cache
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+import anyio.to_thread
+import httpx
+from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.requests import Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
 from database import get_db, engine, Base
 from models import AssessmentJob, Tenant, MigrationPlan
-from schemas import AssessmentRequest, MigrationRequest
+from schemas import AssessmentRequest, MigrationRequest, JobStatusLite, AssessmentJobDetail, MigrationPlanDetail
 
 from services.azure_connector import AzureConnector
 from services.inventory import InventoryService
-from services.ai_service import AIService
+from services.ai_service import get_ai_service
 from services.compatibility import CompatibilityService
 from services.report_service import ReportService
 from services.migration import MigrationService
@@ -34,8 +44,28 @@ load_dotenv(override=True)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create tables (for MVP only - usually use Alembic)
-Base.metadata.create_all(bind=engine)
+# Sync endpoints and their DB sessions run on Starlette's threadpool (40 threads by default)
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "100"))
+
+# Long-running assessment/migration jobs get dedicated workers so they never
+# compete with request handling for the shared threadpool
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", "32"))
+_bg_pool = concurrent.futures.ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix="jobs")
+
+# Azure moves run for minutes to hours; instead of a worker blocking on each
+# one, all in-flight moves are checked together every few seconds
+MOVE_POLL_INTERVAL = int(os.getenv("MOVE_POLL_INTERVAL", "15"))
+# A move still running after MOVE_TIMEOUT seconds, or whose status check fails
+# MOVE_MAX_POLL_FAILURES times in a row, is marked FAILED instead of polled forever
+MOVE_TIMEOUT = int(os.getenv("MOVE_TIMEOUT", str(6 * 3600)))
+MOVE_MAX_POLL_FAILURES = int(os.getenv("MOVE_MAX_POLL_FAILURES", "20"))
+
+# Dashboards re-request the environment context on every navigation; the
+# underlying ARM/Advisor/Security calls are slow and the data changes rarely.
+CONTEXT_CACHE_TTL = int(os.getenv("CONTEXT_CACHE_TTL", "60"))
+CONTEXT_CACHE_MAX_SIZE = 256
+_context_cache: dict = {}
+_context_cache_lock = threading.Lock()
 
 app = FastAPI(
     title="Azure Migration Agent API",
@@ -56,17 +86,28 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     logger.info(">>> SERVER RESTARTING <<<")
+    # Create tables (for MVP only - usually use Alembic). Done here rather than at
+    # import so importing main, e.g. from the tests, never touches the database.
+    Base.metadata.create_all(bind=engine)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    app.state.move_poller = asyncio.create_task(_move_poll_loop())
     logger.info(f"Active Config - Endpoint: {os.getenv('AZURE_OPENAI_ENDPOINT')}")
     logger.info(f"Active Config - Deployment: {os.getenv('AZURE_OPENAI_DEPLOYMENT_NAME')}")
     logger.info(f"Active Config - Origins: {os.getenv('ALLOWED_ORIGINS')}")
     logger.info(">>> VERIFYING AI CONNECTION... <<<")
     try:
-        service = AIService()
+        service = get_ai_service()
         status = await service.check_health()
         logger.info(f"Startup Connectivity Check: {'SUCCESS' if status else 'FAILED'}")
     except Exception as e:
         logger.error(f"Startup Check Crashed: {e}")
 
+@app.on_event("shutdown")
+def shutdown_event():
+    app.state.move_poller.cancel()
+    # Running jobs finish in their threads; queued ones are dropped
+    _bg_pool.shutdown(wait=False, cancel_futures=True)
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Global error handler caught: {exc}")
@@ -75,6 +116,21 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"message": "Internal Server Error", "details": str(exc)},
     )
 
+@lru_cache(maxsize=32)
+def _connector(tenant_id: str = None, client_id: str = None, client_secret: str = None) -> AzureConnector:
+    """
+    Returns a shared AzureConnector per credential set, so credentials (and
+    their token caches) survive across requests instead of being rebuilt.
+    """
+    return AzureConnector(tenant_id, client_id, client_secret)
+
+_RG_RE = re.compile(r"/resourceGroups/([^/]+)", re.IGNORECASE)
+
+def _rg(resource_id: str) -> str:
+    """Extracts the resource group name from an ARM resource ID."""
+    m = _RG_RE.search(resource_id or "")
+    return m.group(1) if m else "Unknown"
+
 # Helper for Safe DB Session in Background Tasks
 @contextmanager
 def safe_db_session():
@@ -90,13 +146,17 @@ def run_assessment_task(job_id: str, subscription_id: str, tenant_id: str, clien
     Uses safe_db_session to ensure cleanup.
     """
     with safe_db_session() as db:
+        job = None
         try:
             logger.info(f"Starting assessment for Job {job_id}")
+            job = db.get(AssessmentJob, job_id)
+            # End the read transaction so the pooled connection isn't held for the whole scan
+            db.commit()
             
-            connector = AzureConnector(tenant_id, client_id, client_secret) 
+            connector = _connector(tenant_id, client_id, client_secret)
             inventory_service = InventoryService(connector)
             compatibility_service = CompatibilityService()
-            ai_service = AIService()
+            ai_service = get_ai_service()
             
             # 1. Run Inventory Scan
             inventory_data = inventory_service.scan_subscription(subscription_id)
@@ -112,7 +172,6 @@ def run_assessment_task(job_id: str, subscription_id: str, tenant_id: str, clien
                 ai_report = f"# Assessment Completed (AI Unavailable)\n\n**Note:** The AI report could not be generated due to provider limits ({str(ai_e)}).\n\nHowever, your infrastructure data and compatibility analysis are fully available below."
 
             # 4. Update Job
-            job = db.query(AssessmentJob).filter(AssessmentJob.id == job_id).first()
             if job:
                 job.status = "COMPLETED"
                 job.inventory_snapshot = inventory_data
@@ -125,8 +184,8 @@ def run_assessment_task(job_id: str, subscription_id: str, tenant_id: str, clien
             logger.error(f"Job {job_id} failed: {str(e)}")
             # We must rollback to ensure the session is clean for the update
             db.rollback() 
-            job = db.query(AssessmentJob).filter(AssessmentJob.id == job_id).first()
             if job:
+                db.refresh(job)
                 job.status = "FAILED"
                 job.blockers = {"error": str(e)}
                 db.commit()
@@ -142,11 +201,11 @@ def read_root():
 @app.get("/api/debug-ai")
 async def debug_ai():
     """Diagnostic endpoint to debug AI connection"""
-    from dotenv import load_dotenv # Keep local import for logic specific to this debug endpoint (force reload)
     load_dotenv(override=True) 
+    get_ai_service.cache_clear()  # Pick up the reloaded provider settings
     
     try:
-        service = AIService()
+        service = get_ai_service()
         health_check = False
         runtime_details = "N/A"
         
@@ -159,7 +218,8 @@ async def debug_ai():
                 # Unified Probe
                 target_model = service.azure_deployment if service.provider == "azure" else service.openai_model
                 
-                resp = service.client.chat.completions.create(
+                resp = await asyncio.to_thread(
+                    service.client.chat.completions.create,
                     model=target_model,
                     messages=[{"role": "user", "content": "probetest"}],
                     max_tokens=5
@@ -183,7 +243,7 @@ async def debug_ai():
 async def ai_status():
     """Checks connection to Azure OpenAI / OpenAI"""
     try:
-        service = AIService()
+        service = get_ai_service()
         logger.info(f"Checking AI Status. Provider: {service.provider}")
         is_connected = await service.check_health()
         logger.info(f"AI Check Result: {is_connected}")
@@ -195,7 +255,6 @@ async def ai_status():
 @app.post("/api/v1/assess")
 def trigger_assessment(
     request: AssessmentRequest, 
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -218,7 +277,7 @@ def trigger_assessment(
     db.refresh(new_job)
     
     # 3. Schedule Background Task
-    background_tasks.add_task(
+    _bg_pool.submit(
         run_assessment_task, 
         new_job.id, 
         request.subscription_id, 
@@ -233,22 +292,35 @@ def trigger_assessment(
         "message": f"Assessment started for subscription {request.subscription_id}"
     }
 
-@app.get("/api/v1/jobs/{job_id}")
+@app.get("/api/v1/jobs/{job_id}", response_model=JobStatusLite)
 def get_job_status(job_id: str, db: Session = Depends(get_db)):
+    """
+    Retrieve the status of an assessment job (cheap enough to poll).
+    Only metadata columns are loaded; use /full for the results.
+    """
+    job = db.query(
+        AssessmentJob.id, AssessmentJob.status, AssessmentJob.tenant_id, AssessmentJob.created_at
+    ).filter(AssessmentJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/v1/jobs/{job_id}/full", response_model=AssessmentJobDetail)
+def get_job_details(job_id: str, db: Session = Depends(get_db)):
     """
     Retrieve status and results of an assessment job.
     """
-    job = db.query(AssessmentJob).filter(AssessmentJob.id == job_id).first()
+    job = db.get(AssessmentJob, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
 @app.get("/api/v1/jobs/{job_id}/export")
-def export_job_report(job_id: str, db: Session = Depends(get_db)):
+async def export_job_report(job_id: str, db: Session = Depends(get_db)):
     """
     Generates and downloads an Excel report for the job.
     """
-    job = db.query(AssessmentJob).filter(AssessmentJob.id == job_id).first()
+    job = await asyncio.to_thread(db.get, AssessmentJob, job_id)
     if not job or not job.inventory_snapshot:
         raise HTTPException(status_code=404, detail="Job or inventory not found")
     
@@ -264,24 +336,26 @@ def export_job_report(job_id: str, db: Session = Depends(get_db)):
         except:
              inventory["subscription_id"] = "Unknown"
 
-    # Sync generation
-    excel_bytes = report_service.generate_excel_report(job_id, inventory, job.blockers)
-    
-    output = io.BytesIO(excel_bytes)
-    output.seek(0)
+    # Workbook generation is CPU-bound; run it off the event loop
+    output = await asyncio.to_thread(report_service.generate_excel_report, job_id, inventory, job.blockers)
     
     headers = {
         'Content-Disposition': f'attachment; filename="Assessment_Report_{job_id}.xlsx"'
     }
-    return StreamingResponse(output, media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', headers=headers)
+    # Already fully built, so send it in one body rather than iterating a BytesIO line by line;
+    # getbuffer() is a view of the buffer, so the workbook isn't copied into a second bytes object
+    return Response(output.getbuffer(), media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', headers=headers)
 
 @app.get("/api/v1/jobs/{job_id}/export/arm")
-def export_arm_templates(job_id: str, db: Session = Depends(get_db)):
+async def export_arm_templates(job_id: str, db: Session = Depends(get_db)):
     """
     Export ARM Templates for BLOCKED resources only.
     Fetches FULL resource details to ensure valid templates.
     """
-    job = db.query(AssessmentJob).filter(AssessmentJob.id == job_id).first()
+    # Snapshot deserialization can be large; keep it off the event loop
+    job = await asyncio.to_thread(
+        lambda: db.query(AssessmentJob).filter(AssessmentJob.id == job_id).first()
+    )
     if not job or not job.inventory_snapshot:
         raise HTTPException(status_code=404, detail="Job or inventory not found")
 
@@ -294,37 +368,26 @@ def export_arm_templates(job_id: str, db: Session = Depends(get_db)):
         sub_id = None
 
     # Setup Connector/Service for fetching full details
-    connector = AzureConnector()
+    connector = _connector()
     ctx_service = ContextService(connector)
     arm_service = ARMService()
 
     # Filter for Blocked resources 
-    full_resources = []
-    
-    # Blockers dict keys are Resource IDs or Names.
+    # Blockers dict keys are Resource IDs or Names (Azure IDs are case-insensitive).
     blockers = job.blockers or {}
+    blocker_keys = {k.lower() for k in blockers}
 
     # Identify targets
-    targets = [res for res in raw_resources if res["id"] in blockers or res["name"] in blockers]
+    targets = [
+        res for res in raw_resources
+        if res["id"].lower() in blocker_keys or (res.get("name") or "").lower() in blocker_keys
+    ]
 
     if not targets:
         # No blocked resources, return empty zip
         zip_bytes = arm_service.generate_arm_zip([], only_blocked=False)
-        output = io.BytesIO(zip_bytes)
-        output.seek(0)
         headers = {'Content-Disposition': f'attachment; filename="Blocked_Resources_Templates_{job_id}.zip"'}
-        return StreamingResponse(output, media_type='application/zip', headers=headers)
-
-    # Identify targets
-    targets = [res for res in raw_resources if res["id"] in blockers or res["name"] in blockers]
-
-    if not targets:
-        # No blocked resources, return empty zip
-        zip_bytes = arm_service.generate_arm_zip([], only_blocked=False)
-        output = io.BytesIO(zip_bytes)
-        output.seek(0)
-        headers = {'Content-Disposition': f'attachment; filename="Blocked_Resources_Templates_{job_id}.zip"'}
-        return StreamingResponse(output, media_type='application/zip', headers=headers)
+        return Response(zip_bytes, media_type='application/zip', headers=headers)
 
     # Parallel Export of INDIVIDUAL Resources
     # User Requirement: 
@@ -335,14 +398,18 @@ def export_arm_templates(job_id: str, db: Session = Depends(get_db)):
     
 
 
-    def export_single_resource(res):
+    # Using 10 in-flight requests to balance speed vs API Rate Limits
+    export_slots = asyncio.Semaphore(10)
+
+    async def export_single_resource(http, res):
         try:
             rg = res.get("resource_group")
             if not rg: return None
             
             # API Call: Export Single Resource
             # Passing a list of 1 ID ensures we get just that resource's template.
-            template = ctx_service.export_resource_template(subscription_id=sub_id, resource_group=rg, resources=[res["id"]])
+            async with export_slots:
+                template = await ctx_service.export_resource_template(http, subscription_id=sub_id, resource_group=rg, resources=[res["id"]])
             
             if "error" in template:
                 logger.error(f"Export Error for {res['name']}: {template['error']}")
@@ -359,38 +426,45 @@ def export_arm_templates(job_id: str, db: Session = Depends(get_db)):
             logger.error(f"Export Crash for {res['name']}: {e}")
             return None
 
-    exported_items = []
-    # Using 10 workers to balance speed vs API Rate Limits
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        results = list(executor.map(export_single_resource, targets))
+    async with httpx.AsyncClient(timeout=httpx.Timeout(60.0, connect=10.0)) as http:
+        # Kick off template exports first so they overlap with the context fetch below
+        export_tasks = [asyncio.ensure_future(export_single_resource(http, res)) for res in targets]
+
+        # --- EXTRA EXPORTS (RBAC, PIPS, VMS) ---
+        logger.info("Fetching extra export data (RBAC, PIPs, VMs)...")
+        all_rbacs, role_defs, pips, vms = await asyncio.gather(
+            asyncio.to_thread(ctx_service.get_role_assignments, sub_id),
+            asyncio.to_thread(ctx_service.get_role_definitions, sub_id), # ID -> Name map
+            asyncio.to_thread(ctx_service.get_public_ips, sub_id),
+            asyncio.to_thread(ctx_service.get_vms, sub_id)
+        )
+
+        results = await asyncio.gather(*export_tasks)
         exported_items = [r for r in results if r]
 
-    # --- EXTRA EXPORTS (RBAC, PIPS, VMS) ---
-    logger.info("Fetching extra export data (RBAC, PIPs, VMs)...")
-    
     # 1. RBAC (Enriched)
     # Requested Columns: RoleAssignmentId, Scope, DisplayName, SignInName, RoleDefinitionName, RoleDefinitionId, ObjectId, ObjectType, RoleAssignmentDescription, ConditionVersion, Condition
     rbac_csv_rows = [["RoleAssignmentId", "Scope", "DisplayName", "SignInName", "RoleDefinitionName", "RoleDefinitionId", "ObjectId", "ObjectType", "RoleAssignmentDescription", "ConditionVersion", "Condition"]]
     
-    all_rbacs = ctx_service.get_role_assignments(sub_id)
-    role_defs = ctx_service.get_role_definitions(sub_id) # ID -> Name map
-    
     # Collect Principal IDs for Batch Resolution
     principal_ids = set()
     filtered_rbacs = []
-    sub_scope_prefix = f"/subscriptions/{sub_id}"
+    sub_scope_prefix = f"/subscriptions/{sub_id}".lower()
 
     for r in all_rbacs:
-        scope = r.get("properties", {}).get("scope", "").lower()
-        if not scope.startswith(sub_scope_prefix.lower()):
+        props = r.get("properties", {})
+        if not props.get("scope", "").lower().startswith(sub_scope_prefix):
             continue
         filtered_rbacs.append(r)
-        principal_ids.add(r.get("properties", {}).get("principalId"))
+        if props.get("principalId"):
+            principal_ids.add(props["principalId"])
     
-    # Resolve Principals via Graph (User/Group Names)
-    principal_map = ctx_service.resolve_principals(list(principal_ids))
-    
-    rbac_json = []
+    # Resolve Principals via Graph (User/Group Names) - one batched lookup for all unique IDs
+    async with httpx.AsyncClient(timeout=30) as graph_http:
+        principal_map = await ctx_service.resolve_principals_async(graph_http, list(principal_ids))
+
+    # Role definition IDs differ in casing between assignments and definitions
+    role_defs_lc = {k.lower(): v for k, v in role_defs.items()}
 
     for r in filtered_rbacs:
         props = r.get("properties", {})
@@ -399,14 +473,11 @@ def export_arm_templates(job_id: str, db: Session = Depends(get_db)):
         p_id = props.get("principalId")
         rd_id = props.get("roleDefinitionId")
         
-        # Role Name
-        role_name = role_defs.get(rd_id, "Unknown Role")
-        if role_name == "Unknown Role" and rd_id:
-             # Try matching just the UUID part if full ID failed
-             uuid_part = rd_id.split("/")[-1]
-             # Search values (slow linear scan but safe for small list)
-             # Better: ContextService already maps UUID -> Name if possible
-             pass
+        # Role Name (full ID first, then the definition UUID)
+        role_name = "Unknown Role"
+        if rd_id:
+            rd_lc = rd_id.lower()
+            role_name = role_defs_lc.get(rd_lc) or role_defs_lc.get(rd_lc.rsplit("/", 1)[-1], "Unknown Role")
 
         # Principal Data
         p_data = principal_map.get(p_id, {})
@@ -431,7 +502,6 @@ def export_arm_templates(job_id: str, db: Session = Depends(get_db)):
         rbac_csv_rows.append(row)
 
     # 2. Public IPs
-    pips = ctx_service.get_public_ips(sub_id)
     pip_csv_rows = [["Name", "Resource Group", "IP Address", "SKU", "Assignment", "Associated to", "Location", "Subscription"]]
     
     # Helper to map NIC ID to PIP Address (for VM export later)
@@ -464,7 +534,7 @@ def export_arm_templates(job_id: str, db: Session = Depends(get_db)):
         
         pip_csv_rows.append([
             p.get("name"),
-            p.get("id", "").split("/resourceGroups/")[1].split("/")[0] if "/resourceGroups/" in p.get("id", "") else "Unknown",
+            _rg(p.get("id")),
             props.get("ipAddress"),
             sku,
             props.get("publicIPAllocationMethod"),
@@ -474,7 +544,6 @@ def export_arm_templates(job_id: str, db: Session = Depends(get_db)):
         ])
 
     # 3. Virtual Machines
-    vms = ctx_service.get_vms(sub_id)
     vm_csv_rows = [["Name", "Resource Group", "Location", "Subscription", "Status", "Operating System", "Size", "Public IP Address"]]
     
     for vm in vms:
@@ -512,7 +581,7 @@ def export_arm_templates(job_id: str, db: Session = Depends(get_db)):
         
         vm_csv_rows.append([
             vm.get("name"),
-            vm.get("id", "").split("/resourceGroups/")[1].split("/")[0] if "/resourceGroups/" in vm.get("id", "") else "Unknown",
+            _rg(vm.get("id")),
             vm.get("location"),
             sub_id,
             status,
@@ -521,87 +590,99 @@ def export_arm_templates(job_id: str, db: Session = Depends(get_db)):
             vm_pip
         ])
 
-    # Generate ZIP
-    import zipfile
-    import csv
-    
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_DEFLATED, False) as zip_file:
-         # Standard Exports
-         for item in exported_items:
+    # Generate ZIP (streamed entry by entry)
+    def write_csv(zip_file, name, rows):
+        # Rows are encoded straight into the compressed entry, no intermediate string
+        with zip_file.open(name, "w") as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as text:
+            csv.writer(text).writerows(rows)
+
+    def write_export(zip_file):
+        # Standard Exports
+        for item in exported_items:
             res = item["resource"]
-            type_folder = res.get("type", "Unknown").split("/")[-1] 
+            type_folder = res.get("type", "Unknown").split("/")[-1]
             res_name = res.get("name", "Unknown")
-            
+
             if "template" in item:
                 file_path = f"{type_folder}/{res_name}/template.json"
                 content = item["template"]
                 if "template" in content: content = content["template"]
-                zip_file.writestr(file_path, json.dumps(content, indent=4))
+                zip_file.writestr(file_path, orjson.dumps(content, option=orjson.OPT_INDENT_2))
             elif "error" in item:
                 file_path = f"{type_folder}/{res_name}/error.log"
                 zip_file.writestr(file_path, str(item["error"]))
-        
-         # Extra Exports Folder
-         # RBAC
-         # Save JSON BEFORE CSV loop to keep it clean/official
-         zip_file.writestr("Extra_Exports/RBAC.json", json.dumps(filtered_rbacs, indent=4))
-         
-         rbac_csv_io = io.StringIO()
-         csv.writer(rbac_csv_io).writerows(rbac_csv_rows)
-         zip_file.writestr("Extra_Exports/RBAC.csv", rbac_csv_io.getvalue())
-         
-         # Public IPs
-         zip_file.writestr("Extra_Exports/PublicIPs.json", json.dumps(pips, indent=4)) 
-         pip_csv_io = io.StringIO()
-         csv.writer(pip_csv_io).writerows(pip_csv_rows)
-         zip_file.writestr("Extra_Exports/PublicIPs.csv", pip_csv_io.getvalue())
-
-         # VMs
-         zip_file.writestr("Extra_Exports/VirtualMachines.json", json.dumps(vms, indent=4))
-         vm_csv_io = io.StringIO()
-         csv.writer(vm_csv_io).writerows(vm_csv_rows)
-         zip_file.writestr("Extra_Exports/VirtualMachines.csv", vm_csv_io.getvalue())
-
-
-    zip_bytes = zip_buffer.getvalue()
-    
-    output = io.BytesIO(zip_bytes)
-    output.seek(0)
-    
+            yield
+
+        # Extra Exports Folder
+        # RBAC
+        # Save JSON BEFORE CSV loop to keep it clean/official
+        zip_file.writestr("Extra_Exports/RBAC.json", orjson.dumps(filtered_rbacs, option=orjson.OPT_INDENT_2))
+        write_csv(zip_file, "Extra_Exports/RBAC.csv", rbac_csv_rows)
+        yield
+
+        # Public IPs
+        zip_file.writestr("Extra_Exports/PublicIPs.json", orjson.dumps(pips, option=orjson.OPT_INDENT_2))
+        write_csv(zip_file, "Extra_Exports/PublicIPs.csv", pip_csv_rows)
+        yield
+
+        # VMs
+        zip_file.writestr("Extra_Exports/VirtualMachines.json", orjson.dumps(vms, option=orjson.OPT_INDENT_2))
+        write_csv(zip_file, "Extra_Exports/VirtualMachines.csv", vm_csv_rows)
+        yield
+
     headers = {
         'Content-Disposition': f'attachment; filename="Blocked_Resources_Templates_{job_id}.zip"'
     }
-    return StreamingResponse(output, media_type='application/zip', headers=headers)
+    # Sync iterator on purpose: Starlette pulls each chunk in its threadpool, so
+    # serializing and deflating the larger RBAC/VM payloads never blocks the loop
+    return StreamingResponse(arm_service.iter_zip(write_export), media_type='application/zip', headers=headers)
 
 @app.get("/api/v1/context")
-def get_environment_context(subscription_id: str, tenant_id: str = None, client_id: str = None, client_secret: str = None):
+async def get_environment_context(subscription_id: str, tenant_id: str = None, client_id: str = None, client_secret: str = None):
     """
     Returns Key Info about the environment: Scores, Plan, etc.
     """
+    # Credentials are part of the key so a cached answer is never served to a different principal
+    key = (tenant_id, subscription_id, client_id, client_secret)
+    now = time.time()
+    with _context_cache_lock:
+        cached = _context_cache.get(key)
+        if cached and cached[1] > now:
+            return cached[0]
+
     try:
-        # Create fresh connector (lightweight)
-        connector = AzureConnector(tenant_id, client_id, client_secret)
+        connector = _connector(tenant_id, client_id, client_secret)
         ctx_service = ContextService(connector)
-        return ctx_service.get_context_data(subscription_id)
+        async with httpx.AsyncClient() as http:
+            data = await ctx_service.get_context_data_async(http, subscription_id)
     except Exception as e:
         logger.error(f"Context API failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    with _context_cache_lock:
+        if len(_context_cache) >= CONTEXT_CACHE_MAX_SIZE:
+            for k in [k for k, (_, exp) in _context_cache.items() if exp <= now]:
+                del _context_cache[k]
+            while len(_context_cache) >= CONTEXT_CACHE_MAX_SIZE:
+                del _context_cache[next(iter(_context_cache))]
+        _context_cache[key] = (data, now + CONTEXT_CACHE_TTL)
+    return data
+
 def run_migration_task(plan_id: str, request: MigrationRequest, subscription_id: str):
     """
     Background task to orchestrate migration.
     Uses safe_db_session for reliability.
     """
     with safe_db_session() as db:
+        plan = None
         try:
             logger.info(f"Starting migration plan {plan_id}")
-            connector = AzureConnector()
+            connector = _connector()
             service = MigrationService(connector)
             
             # 1. Update status to VALIDATING
-            plan = db.query(MigrationPlan).filter(MigrationPlan.id == plan_id).first()
-            job = db.query(AssessmentJob).filter(AssessmentJob.id == plan.job_id).first()
+            plan = db.get(MigrationPlan, plan_id)
+            job = db.get(AssessmentJob, plan.job_id)
             
             if plan:
                 plan.status = "VALIDATING"
@@ -616,7 +697,8 @@ def run_migration_task(plan_id: str, request: MigrationRequest, subscription_id:
                 request.source_resource_group, 
                 request.target_resource_group_id, 
                 request.resources,
-                inventory_snapshot=snapshot
+                inventory_snapshot=snapshot,
+                snapshot_id=job.id if job else None
             )
 
             if not validation["valid"]:
@@ -626,41 +708,110 @@ def run_migration_task(plan_id: str, request: MigrationRequest, subscription_id:
                 db.commit()
                 return
 
-            # 3. Execute
-            plan.status = "MOVING"
-            db.commit()
-            
-            result = service.execute_move(
+            # 3. Kick off the move; progress is polled from its continuation token
+            token = service.start_move(
                 subscription_id, 
                 request.source_resource_group, 
                 request.target_resource_group_id, 
                 request.resources
             )
-            
-            if result["success"]:
-                plan.status = "COMPLETED"
-                plan.execution_log = {"status": "success"}
-            else:
-                plan.status = "FAILED"
-                plan.execution_log = {"error": result["error"]}
-            
+            plan.status = "MOVING"
+            plan.execution_log = {
+                "continuation_token": token,
+                "subscription_id": subscription_id,
+                "source_resource_group": request.source_resource_group,
+                "started_at": time.time(),
+                "poll_failures": 0,
+            }
             db.commit()
-            logger.info(f"Migration plan {plan_id} finished with status {plan.status}")
+
+            # The move is already running in Azure, so a failed first check must not
+            # mark the plan CRASHED and drop its continuation token
+            try:
+                _check_move(db, plan, service)
+            except Exception as e:
+                _record_poll_failure(db, plan, e)
 
         except Exception as e:
             logger.error(f"Migration plan {plan_id} crashed: {str(e)}")
             # Rollback to ensure clean state
             db.rollback()
-            plan = db.query(MigrationPlan).filter(MigrationPlan.id == plan_id).first()
             if plan:
+                db.refresh(plan)
                 plan.status = "CRASHED"
                 plan.execution_log = {"error": str(e)}
                 db.commit()
 
-@app.post("/api/v1/migrate")
+def _check_move(db: Session, plan: MigrationPlan, service: MigrationService):
+    """Checks a MOVING plan's operation once and records the outcome when it has ended."""
+    log = plan.execution_log
+    result = service.poll_move(log["subscription_id"], log["source_resource_group"], log["continuation_token"])
+    if not result["done"]:
+        if time.time() - log.get("started_at", time.time()) > MOVE_TIMEOUT:
+            plan.status = "FAILED"
+            plan.execution_log = {"error": f"Move did not finish within {MOVE_TIMEOUT} seconds (last status {result['status']})"}
+            db.commit()
+            logger.error(f"Migration plan {plan.id} timed out")
+        elif log.get("poll_failures"):
+            plan.execution_log = {**log, "poll_failures": 0}
+            db.commit()
+        return
+
+    if result["success"]:
+        plan.status = "COMPLETED"
+        plan.execution_log = {"status": "success"}
+    else:
+        plan.status = "FAILED"
+        plan.execution_log = {"error": result["error"]}
+    db.commit()
+    logger.info(f"Migration plan {plan.id} finished with status {plan.status}")
+
+def _record_poll_failure(db: Session, plan: MigrationPlan, error: Exception):
+    """
+    Counts a failed status check against a MOVING plan. Transient errors leave it
+    MOVING for the next round, until they've repeated too many times to still be transient.
+    """
+    plan_id = plan.id
+    logger.warning(f"Polling migration plan {plan_id} failed: {error}")
+    db.rollback()
+    failures = plan.execution_log.get("poll_failures", 0) + 1
+    if failures >= MOVE_MAX_POLL_FAILURES:
+        plan.status = "FAILED"
+        plan.execution_log = {"error": f"Move status check failed {failures} times in a row: {error}"}
+        logger.error(f"Migration plan {plan_id} failed after {failures} status check errors")
+    else:
+        plan.execution_log = {**plan.execution_log, "poll_failures": failures}
+    db.commit()
+
+def poll_migration_task(plan_id: str):
+    with safe_db_session() as db:
+        plan = db.get(MigrationPlan, plan_id)
+        if not plan or plan.status != "MOVING":
+            return
+        try:
+            _check_move(db, plan, MigrationService(_connector()))
+        except Exception as e:
+            _record_poll_failure(db, plan, e)
+
+def poll_active_moves():
+    """Checks every in-flight move once, concurrently on the job pool."""
+    with safe_db_session() as db:
+        plan_ids = db.scalars(select(MigrationPlan.id).where(MigrationPlan.status == "MOVING")).all()
+    concurrent.futures.wait([_bg_pool.submit(poll_migration_task, plan_id) for plan_id in plan_ids])
+
+async def _move_poll_loop():
+    # Plans keep their continuation token, so moves started before a restart resume here too
+    while True:
+        await asyncio.sleep(MOVE_POLL_INTERVAL)
+        try:
+            await anyio.to_thread.run_sync(poll_active_moves)
+        except Exception as e:
+            logger.error(f"Move poll round failed: {e}")
+
+@app.post("/api/v1/migrate", status_code=202)
 def trigger_migration(
     request: MigrationRequest,
-    background_tasks: BackgroundTasks,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
@@ -693,20 +844,21 @@ def trigger_migration(
     except:
         raise HTTPException(status_code=400, detail="Invalid resource ID format")
 
-    background_tasks.add_task(
+    _bg_pool.submit(
         run_migration_task,
         plan.id,
         request,
         subscription_id
     )
     
+    response.headers["Location"] = f"/api/v1/plans/{plan.id}"
     return {
         "plan_id": plan.id,
         "status": "ACCEPTED",
         "message": "Migration orchestration started"
     }
 
-@app.get("/api/v1/plans/{plan_id}")
+@app.get("/api/v1/plans/{plan_id}", response_model=MigrationPlanDetail)
 def get_plan_status(plan_id: str, db: Session = Depends(get_db)):
     plan = db.query(MigrationPlan).filter(MigrationPlan.id == plan_id).first()
     if not plan:
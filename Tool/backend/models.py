@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, JSON, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, JSON, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -19,6 +19,10 @@ class Tenant(Base):
 
 class AssessmentJob(Base):
     __tablename__ = "assessment_jobs"
+    __table_args__ = (
+        # Covers per-tenant job listings filtered by status, newest first
+        Index("ix_jobs_tenant_status_created", "tenant_id", "status", "created_at"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     tenant_id = Column(String, ForeignKey("tenants.id"))
@@ -33,6 +37,7 @@ class AssessmentJob(Base):
 
 class MigrationPlan(Base):
     __tablename__ = "migration_plans"
+    __table_args__ = (Index("ix_plans_job", "job_id"),)
 
     id = Column(String, primary_key=True, default=generate_uuid)
     job_id = Column(String, ForeignKey("assessment_jobs.id"))
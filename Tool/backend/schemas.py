@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
 from typing import List, Optional, Dict, Any
 
 class AssessmentRequest(BaseModel):
@@ -18,3 +19,27 @@ class JobResponse(BaseModel):
     job_id: str
     status: str
     message: Optional[str] = None
+
+class JobStatusLite(BaseModel):
+    """Job metadata only; the inventory and report are served by /jobs/{id}/full."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    status: str
+    tenant_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class AssessmentJobDetail(JobStatusLite):
+    inventory_snapshot: Optional[Dict[str, Any]] = None
+    blockers: Optional[Dict[str, Any]] = None
+    ai_generated_summary: Optional[str] = None
+
+class MigrationPlanDetail(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    job_id: Optional[str] = None
+    status: str
+    ordered_batches: Optional[Any] = None
+    execution_log: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
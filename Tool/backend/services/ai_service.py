@@ -1,11 +1,21 @@
 from typing import Dict, Any, List
-import json
+import asyncio
+import csv
+import orjson
 import logging
 import os
+from collections import Counter
+from functools import lru_cache
+import httpx
+from openai import OpenAI, AzureOpenAI, DefaultHttpxClient
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 logger = logging.getLogger(__name__)
 
+# One keep-alive pool for all LLM traffic, shared across AIService instances
+# (e.g. after /api/debug-ai rebuilds the service from a reloaded .env)
+_openai_http = DefaultHttpxClient(limits=httpx.Limits(max_connections=50, max_keepalive_connections=20))
+
 class AIService:
     def __init__(self):
         # Support for Azure OpenAI
@@ -20,11 +30,14 @@ class AIService:
 
         self.client = None
         self.provider = "mock"
+
+        # Official move-support matrix, keyed by lowercased resource type
+        self._move_support = self._load_move_support()
+        # LLM verdicts for types the matrix does not cover
+        self._assessment_cache: Dict[str, Dict[str, Any]] = {}
         
         # 1. Try Generic OpenAI Client (Priority for Flexibility)
         if self.openai_api_key:
-            from openai import OpenAI
-            
             # Auto-detect base_url for known providers if not explicitly set
             if not self.openai_base_url:
                 if os.getenv("GROQ_API_KEY"):
@@ -39,7 +52,8 @@ class AIService:
 
             self.client = OpenAI(
                 api_key=self.openai_api_key,
-                base_url=self.openai_base_url # can be None (defaults to official)
+                base_url=self.openai_base_url, # can be None (defaults to official)
+                http_client=_openai_http
             )
             
             # Fallback provider name if official
@@ -56,11 +70,11 @@ class AIService:
 
         # 2. Try Azure OpenAI (Legacy/Enterprise)
         elif self.azure_api_key and self.azure_endpoint:
-            from openai import AzureOpenAI
             self.client = AzureOpenAI(
                 api_key=self.azure_api_key,
                 api_version="2023-05-15",
-                azure_endpoint=self.azure_endpoint
+                azure_endpoint=self.azure_endpoint,
+                http_client=_openai_http
             )
             self.provider = "azure"
             logger.info("AIService initialized with Azure OpenAI.")
@@ -73,16 +87,16 @@ class AIService:
         Generates a markdown report by analyzing the inventory and blockers.
         Acts as a bridge to the LLM.
         """
-        # ... (Sanitization logic remains same)
-        
-        resource_counts = {}
-        for r in inventory.get("resources", []):
-            rtype = r["type"].split("/")[-1] # Simplification
-            resource_counts[rtype] = resource_counts.get(rtype, 0) + 1
+        # Nothing to analyse: skip the LLM round-trip entirely
+        if not inventory.get("resources"):
+            return self._mock_llm_response({"total_resources": 0, "resource_distribution": {}, "blocker_count": 0}, {})
+
+        # Simplification: count by the last type segment (e.g. virtualMachines)
+        resource_counts = Counter(r["type"].rsplit("/", 1)[-1] for r in inventory.get("resources", []))
 
         summary_data = {
             "total_resources": inventory["total_resources"],
-            "resource_distribution": resource_counts,
+            "resource_distribution": dict(resource_counts),
             "blocker_count": len(blockers) if blockers else 0
         }
 
@@ -101,13 +115,14 @@ class AIService:
         
         user_prompt = f"""
         Data:
-        {json.dumps(summary_data, indent=2)}
-        
-        Blocking Issues:
-        {json.dumps(blockers, indent=2) if blockers else "None"}
+        {orjson.dumps(summary_data, option=orjson.OPT_INDENT_2).decode()}
         """
         
         if blockers:
+             user_prompt += f"""
+        Blocking Issues:
+        {orjson.dumps(blockers, option=orjson.OPT_INDENT_2).decode()}
+        """
              user_prompt += "\nExplain the risks of Classic resources and Management Locks."
 
         logger.info(f"Sending prompt to AI Engine ({self.provider})...")
@@ -141,7 +156,9 @@ class AIService:
             # Unified Health Check
             model = self.azure_deployment if self.provider == "azure" else self.openai_model
 
-            self.client.chat.completions.create(
+            # The SDK client is sync; keep the network wait off the event loop
+            await asyncio.to_thread(
+                self.client.chat.completions.create,
                 model=model,
                 messages=[{"role": "user", "content": "ping"}],
                 max_tokens=1
@@ -154,28 +171,24 @@ class AIService:
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10), retry=retry_if_exception_type(Exception))
     def assess_migration_readiness(self, resource_type: str) -> Dict[str, Any]:
         """
-        Asks the AI if a specific resource type supports migration.
+        Decides if a specific resource type supports migration.
+        The official move-support matrix answers directly; the AI is only asked about unlisted types.
         """
+        # 1. Official Documentation (deterministic, no LLM call)
+        rt_lower = resource_type.lower()
+        if rt_lower in self._move_support:
+            # The reason doubles as the blocker text on the report, so say what the matrix says
+            supported = self._move_support[rt_lower]
+            verdict = "supports" if supported else "does not support"
+            return {"supported": supported, "reason": f"{resource_type} {verdict} move across subscriptions (Azure move-support matrix)"}
+
+        if rt_lower in self._assessment_cache:
+            return self._assessment_cache[rt_lower]
+
         if not self.client:
              return {"supported": False, "reason": "AI Connection Failed"}
 
-        # 1. Retrieve Context
-        rt_lower = resource_type.lower()
         context_str = "No specific official documentation found for this type."
-        
-        csv_path = os.path.join(os.path.dirname(__file__), "..", "data", "move-support-resources.csv")
-        if os.path.exists(csv_path):
-            try:
-                with open(csv_path, "r", encoding="utf-8-sig") as f:
-                    import csv
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        if row.get("Resource", "").strip().lower() == rt_lower:
-                            move_sub = row.get("Move Subscription", "0").strip()
-                            context_str = f"Official Documentation Data: Resource='{row.get('Resource')}', MoveSubscriptionSupport='{'Yes' if move_sub == '1' else 'No'}'."
-                            break
-            except Exception:
-                pass
 
         # 2. AI Decision
         prompt = f"""
@@ -211,42 +224,72 @@ class AIService:
             elif "```" in content:
                  content = content.split("```")[1].split("```")[0]
             
-            return json.loads(content.strip())
+            result = orjson.loads(content.strip())
+            self._assessment_cache[rt_lower] = result
+            return result
         except Exception as e:
             logger.error(f"AI assessment error: {e}")
             raise e
 
+    @staticmethod
+    def _load_move_support() -> Dict[str, bool]:
+        """
+        Reads data/move-support-resources.csv once into {resource type (lower): movable}.
+        """
+        csv_path = os.path.join(os.path.dirname(__file__), "..", "data", "move-support-resources.csv")
+        if not os.path.exists(csv_path):
+            return {}
+        support = {}
+        try:
+            with open(csv_path, "r", encoding="utf-8-sig") as f:
+                for row in csv.DictReader(f):
+                    if row.get("Resource"):
+                        # First row wins, matching the old top-down scan
+                        support.setdefault(row["Resource"].strip().lower(), (row.get("Move Subscription") or "0").strip() == "1")
+            return support
+        except Exception as e:
+            logger.warning(f"Could not load move-support matrix: {e}")
+            return {}
+
     def _mock_llm_response(self, summary_data: Dict, blockers: Dict) -> str:
         """
         Simulates the LLM output based on input data.
         """
-        md = "# Executive Summary\n"
-        md += f"The assessment found **{summary_data['total_resources']} resources** eligible for analysis.\n"
+        parts = ["# Executive Summary\n"]
+        parts.append(f"The assessment found **{summary_data['total_resources']} resources** eligible for analysis.\n")
         
         if summary_data['blocker_count'] > 0:
-            md += f"⚠️ **{summary_data['blocker_count']} logic blockers** were identified that prevent immediate migration.\n\n"
+            parts.append(f"⚠️ **{summary_data['blocker_count']} logic blockers** were identified that prevent immediate migration.\n\n")
         else:
-            md += "✅ No critical blocking issues were found. The environment appears ready for migration.\n\n"
+            parts.append("✅ No critical blocking issues were found. The environment appears ready for migration.\n\n")
 
-        md += "## Infrastructure Overview\n"
-        for k, v in summary_data['resource_distribution'].items():
-            md += f"- **{k}**: {v}\n"
+        parts.append("## Infrastructure Overview\n")
+        parts.extend(f"- **{k}**: {v}\n" for k, v in summary_data['resource_distribution'].items())
         
-        md += "\n## Critical Issues\n"
+        parts.append("\n## Critical Issues\n")
         if blockers:
             for res_id, issues in blockers.items():
-                short_id = res_id.split("/")[-1]
-                md += f"### {short_id}\n"
-                for issue in issues:
-                    md += f"- 🔴 {issue}\n"
-                md += "\n"
+                short_id = res_id.rsplit("/", 1)[-1]
+                parts.append(f"### {short_id}\n")
+                parts.extend(f"- 🔴 {issue}\n" for issue in issues)
+                parts.append("\n")
         else:
-            md += "No critical issues detected.\n"
+            parts.append("No critical issues detected.\n")
 
-        md += "\n## Recommended Strategy\n"
-        md += "1. **Preparation**: Backup configuration of all Network Interfaces.\n"
+        parts.append("\n## Recommended Strategy\n")
+        parts.append("1. **Preparation**: Backup configuration of all Network Interfaces.\n")
         if "virtualMachines" in summary_data['resource_distribution']:
-             md += "2. **Compute**: VMs should be stopped during the move to ensure data consistency.\n"
-        md += "3. **Execution**: Use the Migration Agent's 'Validate Move' before final execution.\n"
+             parts.append("2. **Compute**: VMs should be stopped during the move to ensure data consistency.\n")
+        parts.append("3. **Execution**: Use the Migration Agent's 'Validate Move' before final execution.\n")
         
-        return md
+        # Built as a list and joined once; repeated += re-copies the whole report
+        return "".join(parts)
+
+@lru_cache(maxsize=1)
+def get_ai_service() -> AIService:
+    """
+    Returns the process-wide AIService so its HTTP client (and pooled
+    keep-alive connections) is reused across requests and jobs.
+    Call get_ai_service.cache_clear() after changing provider env vars.
+    """
+    return AIService()
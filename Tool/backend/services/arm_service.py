@@ -1,7 +1,32 @@
-import json
-import io
+import os
+import orjson
 import zipfile
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, ClassVar, Iterator
+
+# Templates are small JSON documents; the fastest deflate level keeps export CPU
+# low at a modest size cost. Raise it (up to 9) when download size matters more.
+ZIP_COMPRESSLEVEL = int(os.getenv("ARM_ZIP_COMPRESSLEVEL", "1"))
+
+class _ZipChunkBuffer:
+    """
+    Write-only sink for ZipFile. Bytes accumulate until drained, so an archive
+    can be sent downstream entry by entry instead of being buffered whole.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
 
 class ARMService:
     """
@@ -9,58 +34,69 @@ class ARMService:
     Structure: Resource Type / Resource Name / template.json
     """
 
+    # Read-Only / System properties that cause deployment errors
+    _READONLY_KEYS: ClassVar[frozenset] = frozenset({
+        "provisioningState", "resourceId", "status", "uniqueId", "vmId",
+        "timeCreated", "defaultHostName", "inboundIpHeaders", "outboundIpHeaders"
+    })
+
     def generate_arm_zip(self, resources: List[Dict[str, Any]], only_blocked: bool = False, blockers: Dict[str, Any] = None) -> bytes:
         """
         Generates a ZIP file containing ARM templates.
+        Prefer generate_arm_zip_stream for anything sent over HTTP.
         """
-        zip_buffer = io.BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_DEFLATED, False) as zip_file:
-            for res in resources:
-                # Filter logic
-                if only_blocked and blockers:
-                    # If this resource ID is NOT in blockers, skip it
-                    # But wait, blockers dict keys are IDs.
-                    if res["id"] not in blockers and res["name"] not in blockers: 
-                         # Check strict ID match or loose name match (safety)
-                         # Blockers are usually keyed by ID in my app
-                         continue
+        return b"".join(self.generate_arm_zip_stream(resources, only_blocked, blockers))
 
+    def generate_arm_zip_stream(self, resources: List[Dict[str, Any]], only_blocked: bool = False, blockers: Dict[str, Any] = None) -> Iterator[bytes]:
+        """
+        Streams a ZIP of ARM templates, one compressed entry per chunk.
+        """
+        if only_blocked and blockers:
+            # If this resource ID is NOT in blockers, skip it
+            # Check strict ID match or loose name match (safety)
+            resources = [res for res in resources if res["id"] in blockers or res["name"] in blockers]
+
+        def populate(zip_file):
+            for res in resources:
                 # Generate Template Content
                 template = self._create_single_resource_template(res)
-                template_str = json.dumps(template, indent=4)
-                
-                # Determine Path
-                # Type: Microsoft.Network/virtualNetworks -> Virtual Network
-                # Folder: Virtual Network (Sanitized)
-                # Name: Resource Name
-                
+                template_bytes = orjson.dumps(template, option=orjson.OPT_INDENT_2)
+
+                # Path: Type/Name/template.json
                 type_folder = res.get("type", "Unknown").split("/")[-1] # Simple type name
                 res_name = res.get("name", "Unknown")
-                
-                # Path: Type/Name/template.json
-                file_path = f"{type_folder}/{res_name}/template.json"
-                
-                zip_file.writestr(file_path, template_str)
-                
-        zip_buffer.seek(0)
-        return zip_buffer.getvalue()
+                zip_file.writestr(f"{type_folder}/{res_name}/template.json", template_bytes)
+                yield
+
+        return self.iter_zip(populate)
+
+    def iter_zip(self, populate: Callable[[zipfile.ZipFile], Iterator[Any]]) -> Iterator[bytes]:
+        """
+        Streams a ZIP archive in chunks.
+        `populate` is a generator function that writes entries into the given ZipFile
+        and yields after each one; the finished bytes are flushed downstream at every yield.
+        """
+        sink = _ZipChunkBuffer()
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED, False, compresslevel=ZIP_COMPRESSLEVEL) as zip_file:
+            for _ in populate(zip_file):
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        # Central directory is written on close
+        yield sink.drain()
 
     def _create_single_resource_template(self, resource: Dict[str, Any]) -> Dict[str, Any]:
         """
         Wraps a resource definition in a valid ARM deployment template structure.
         """
-        # Clean the resource definition for ARM
-        props = resource.get("properties", {}).copy() if resource.get("properties") else {}
-        
-        # Remove Read-Only / System properties that cause deployment errors
-        # Typical read-only fields: provisioningState, id, status, uniqueId
-        keys_to_remove = [
-            "provisioningState", "resourceId", "status", "uniqueId", "vmId", 
-            "timeCreated", "defaultHostName", "inboundIpHeaders", "outboundIpHeaders"
-        ]
-        for k in keys_to_remove:
-            props.pop(k, None)
+        # Clean the resource definition for ARM. Most resources carry no read-only
+        # fields, so only copy the (possibly large) properties dict when one is present;
+        # the template is serialized, never mutated, so sharing the original is safe.
+        raw_props = resource.get("properties") or {}
+        if self._READONLY_KEYS.isdisjoint(raw_props):
+            props = raw_props
+        else:
+            props = {k: v for k, v in raw_props.items() if k not in self._READONLY_KEYS}
 
         # Skeleton
         arm_resource = {
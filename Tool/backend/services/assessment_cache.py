@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import threading
+import logging
+import orjson
+from functools import lru_cache
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+DEFAULT_CACHE_PATH = os.path.join(DATA_DIR, "ai_cache.sqlite")
+MOVE_SUPPORT_CSV = os.path.join(DATA_DIR, "move-support-resources.csv")
+# Bump when the shape or wording of stored results changes, so old entries are ignored
+CACHE_FORMAT = "2"
+
+class AssessmentCache:
+    """
+    On-disk cache of AI type assessments, shared by all jobs and surviving restarts.
+    Entries are keyed by provider, model and the move-support matrix mtime, so
+    switching models or refreshing the matrix naturally invalidates them.
+    Falls back to an in-memory dict if the database can't be opened.
+    """
+
+    def __init__(self, path: str = None):
+        self._lock = threading.Lock()
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._conn = None
+        try:
+            self._matrix_version = str(int(os.path.getmtime(MOVE_SUPPORT_CSV)))
+        except OSError:
+            self._matrix_version = "none"
+
+        try:
+            self._conn = sqlite3.connect(path or os.getenv("AI_CACHE_PATH", DEFAULT_CACHE_PATH), check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS type_assessments (key TEXT PRIMARY KEY, result BLOB NOT NULL)")
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"AI assessment cache unavailable, using memory only: {e}")
+            self._conn = None
+
+    def _key(self, provider: str, model: str, res_type: str) -> str:
+        return f"{CACHE_FORMAT}|{provider}|{model}|{self._matrix_version}|{res_type}"
+
+    def get(self, provider: str, model: str, res_type: str) -> Optional[Dict[str, Any]]:
+        key = self._key(provider, model, res_type)
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+            if self._conn is None:
+                return None
+            row = self._conn.execute("SELECT result FROM type_assessments WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        result = orjson.loads(row[0])
+        with self._lock:
+            self._memory[key] = result
+        return result
+
+    def set(self, provider: str, model: str, res_type: str, result: Dict[str, Any]):
+        key = self._key(provider, model, res_type)
+        with self._lock:
+            self._memory[key] = result
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO type_assessments (key, result) VALUES (?, ?)",
+                    (key, orjson.dumps(result)),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to persist AI assessment for {res_type}: {e}")
+
+@lru_cache(maxsize=1)
+def get_assessment_cache() -> AssessmentCache:
+    """Returns the process-wide assessment cache (one SQLite connection)."""
+    return AssessmentCache()
@@ -1,6 +1,63 @@
 from azure.identity import DefaultAzureCredential, ClientSecretCredential, AzureCliCredential
 from azure.mgmt.resource import ResourceManagementClient
 import os
+import logging
+import threading
+import time
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Reuse a token until this many seconds before it expires
+TOKEN_REFRESH_MARGIN = 60
+
+# Module-level so every connector (one per credential set) reuses the same
+# TCP/TLS connections to management.azure.com and graph.microsoft.com.
+# ARM throttles with 429 + Retry-After, so idempotent reads back off and retry;
+# the last response is still returned (not raised) so callers keep their status checks.
+_arm_retry = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=[429, 500, 502, 503, 504],
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+_arm_http = requests.Session()
+_arm_http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=50, max_retries=_arm_retry))
+
+class _CachingCredential:
+    """
+    Wraps a TokenCredential and reuses tokens per scope until shortly before expiry.
+    SDK clients are built per call and each would otherwise ask the underlying
+    credential for a fresh token (AzureCliCredential shells out to `az` every time).
+    """
+
+    def __init__(self, credential):
+        self._credential = credential
+        # scopes -> AccessToken
+        self._cache: dict = {}
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes: str, **kwargs):
+        if kwargs:
+            # Claims challenges / tenant overrides must reach the real credential
+            return self._credential.get_token(*scopes, **kwargs)
+
+        cached = self._cache.get(scopes)
+        if cached and cached.expires_on - time.time() > TOKEN_REFRESH_MARGIN:
+            return cached
+
+        with self._lock:
+            # Another worker may have refreshed while we waited
+            cached = self._cache.get(scopes)
+            if cached and cached.expires_on - time.time() > TOKEN_REFRESH_MARGIN:
+                return cached
+            token = self._credential.get_token(*scopes)
+            self._cache[scopes] = token
+            return token
 
 class AzureConnector:
     def __init__(self, tenant_id: str = None, client_id: str = None, client_secret: str = None):
@@ -9,7 +66,7 @@ class AzureConnector:
         Supports both AzureCliCredential (Env/CLI) and explicit Service Principal.
         """
         if client_id and client_secret and tenant_id:
-            self.credential = ClientSecretCredential(
+            credential = ClientSecretCredential(
                 tenant_id=tenant_id,
                 client_id=client_id,
                 client_secret=client_secret
@@ -17,7 +74,13 @@ class AzureConnector:
         else:
             # Explicitly use Azure CLI Credential to avoid picking up empty/invalid env vars from .env
             # This is the most reliable way for local dev when "az login" is used.
-            self.credential = AzureCliCredential()
+            credential = AzureCliCredential()
+
+        # Shared by raw REST calls and every SDK client this connector creates
+        self.credential = _CachingCredential(credential)
+
+        # Raw ARM/Graph REST calls share one process-wide keep-alive pool
+        self.http = _arm_http
     
     def get_resource_client(self, subscription_id: str) -> ResourceManagementClient:
         """
@@ -47,9 +110,9 @@ class AzureConnector:
         """
         if not self.credential:
             raise Exception("Azure Credential not initialized.")
+
         try:
-            token = self.credential.get_token(scope)
-            return token.token
+            return self.credential.get_token(scope).token
         except Exception as e:
             logger.error(f"Failed to get token for scope {scope}: {e}")
             raise e
@@ -66,13 +129,12 @@ class AzureConnector:
              # However, often ResourceManagementClient has .subscriptions too? 
              # Let's check imports. 'azure-mgmt-resource'.
              # If not, we use raw HTTP with token.
-             import requests
              token = self.get_token()
              headers = {"Authorization": f"Bearer {token}"}
              url = f"https://management.azure.com/subscriptions/{subscription_id}?api-version=2020-01-01"
-             resp = requests.get(url, headers=headers)
+             resp = self.http.get(url, headers=headers)
              if resp.status_code == 200:
-                 return resp.json()
+                 return orjson.loads(resp.content)
              return {"displayName": "Unknown", "subscriptionPolicies": {}}
          except Exception as e:
              return {"displayName": "Error", "error": str(e)}
@@ -1,4 +1,52 @@
+import os
+import re
+import sys
+from enum import IntEnum
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
+from services.ai_service import AIService, get_ai_service
+from services.assessment_cache import AssessmentCache, get_assessment_cache
+
+# Concurrent AI lookups per assessment; keep low enough for provider rate limits
+AI_ASSESSMENT_WORKERS = int(os.getenv("AI_ASSESSMENT_WORKERS", "8"))
+
+_SUB_RE = re.compile(r"^/subscriptions/([^/]+)", re.IGNORECASE)
+
+# Column order of the rows returned by generate_detailed_report
+DETAILED_REPORT_COLUMNS = (
+    "Name", "Type", "Can be moved", "Resource Type",
+    "Resource Group", "Location", "Subscription", "Remarks"
+)
+
+class Blocker(IntEnum):
+    """Instance-level blocker codes; formatted to text only when persisted or rendered."""
+    LOCK = 1
+    CROSS_REGION = 2
+
+BLOCKER_MESSAGES = {
+    Blocker.LOCK: sys.intern("BLOCKER: Resource has Management Locks applied. Remove locks before moving."),
+    Blocker.CROSS_REGION: sys.intern("BLOCKER: Cross-region moves require Azure Resource Mover."),
+}
+
+def format_blockers(codes: List[Blocker]) -> List[str]:
+    return [BLOCKER_MESSAGES[c] for c in codes]
+
+@lru_cache(maxsize=1024)
+def _human_readable_type(res_type: str) -> str:
+    """
+    Converts 'Microsoft.Compute/virtualMachines' to 'Virtual Machine'.
+    Memoized: inventories have thousands of resources but only a few dozen types.
+    """
+    if not res_type: return "Unknown"
+    parts = res_type.split("/")
+    if len(parts) > 1:
+        # "virtualMachines" -> "Virtual Machines"
+        # Simple heuristic: SplitCase or just return last part capitalized
+        name = parts[-1]
+        # Simple space insertion for camelCase if needed, but for now just capitalizing
+        return name[0].upper() + name[1:]
+    return res_type
 
 class CompatibilityService:
     UNSUPPORTED_TYPES = [
@@ -8,19 +56,23 @@ class CompatibilityService:
         "Microsoft.Compute/availabilitySets" 
     ]
     
-    def __init__(self):
+    def __init__(self, ai_service: Optional[AIService] = None, assessment_cache: Optional[AssessmentCache] = None):
+        # Shared AI client so every type lookup reuses one connection pool
+        self._ai_service = ai_service or get_ai_service()
+        # Persistent answers from earlier runs (keyed by provider/model)
+        self._assessment_cache = assessment_cache or get_assessment_cache()
+
         # Cache for AI/Doc assessment answers to avoid redundant API calls
         # Map: ResourceType (str) -> Result (Dict)
         self._type_cache = {}
 
-    def check_resource(self, resource: Dict[str, Any], target_region: str = None) -> List[str]:
+    def check_resource(self, resource: Dict[str, Any], target_region: str = None) -> List[Blocker]:
         """
         Checks a single resource for migration blockers.
-        Returns a list of blockers/warnings.
+        Returns a list of Blocker codes (see format_blockers for the messages).
         Uses cached AI assessment for 'Can be moved' status indirectly.
         """
         issues = []
-        res_type = resource.get("type", "").lower()
         
         # Note: The logic for "Can be moved" (Yes/No) is now handled primarily 
         # in assess_compatibility or generate_detailed_report via AI.
@@ -28,11 +80,11 @@ class CompatibilityService:
 
         # 1. Lock Check
         if resource.get("locks"):
-             issues.append("BLOCKER: Resource has Management Locks applied. Remove locks before moving.")
+             issues.append(Blocker.LOCK)
 
         # 2. Region Check
         if target_region and resource["location"] != target_region:
-             issues.append(f"BLOCKER: Cross-region moves require Azure Resource Mover.")
+             issues.append(Blocker.CROSS_REGION)
 
         return issues
 
@@ -43,37 +95,62 @@ class CompatibilityService:
         """
         report = {}
         
-        # Pre-populate cache for all unique types to batch AI calls (if we supported batching)
-        # For now, just ensures we hit the cache logic efficiently
-        unique_types = set(r.get("type", "").lower() for r in resources)
+        # Resolve every unique type up front (concurrently), then join in memory
+        assessments = self._get_ai_assessments(r.get("type", "").lower() for r in resources)
+        # One message per unsupported type, shared by every resource of that type
+        type_blockers = {
+            t: sys.intern(f"BLOCKER: {a.get('reason', 'Unsupported Resource Type')}")
+            for t, a in assessments.items() if not a.get("supported", False)
+        }
 
         for res in resources:
-            issues = self.check_resource(res, target_region)
+            issues = format_blockers(self.check_resource(res, target_region))
             
             # AI Type Check
-            res_type = res.get("type", "").lower()
-            ai_result = self._get_ai_assessment(res_type)
-            
-            if not ai_result.get("supported", False):
-                reason = ai_result.get("reason", "Unsupported Resource Type")
-                issues.append(f"BLOCKER: {reason}")
+            type_blocker = type_blockers.get(res.get("type", "").lower())
+            if type_blocker:
+                issues.append(type_blocker)
 
             if issues:
                 report[res["id"]] = issues
         return report
 
+    def _get_ai_assessments(self, res_types) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolves assessments for many types, issuing the uncached AI calls in parallel.
+        Failed lookups are returned (not cached) so a batch never retries them per resource.
+        """
+        unique_types = set(res_types)
+        missing = [t for t in unique_types if t not in self._type_cache]
+        results = {t: self._type_cache[t] for t in unique_types if t in self._type_cache}
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(AI_ASSESSMENT_WORKERS, len(missing))) as ex:
+                results.update(zip(missing, ex.map(self._get_ai_assessment, missing)))
+        return results
+
     def _get_ai_assessment(self, res_type: str):
         """
         Retrieves assessment from cache or queries AI Service.
         """
         if res_type in self._type_cache:
             return self._type_cache[res_type]
+
+        ai = self._ai_service
+        provider = getattr(ai, "provider", "unknown")
+        model = getattr(ai, "azure_deployment", None) if provider == "azure" else getattr(ai, "openai_model", None)
+        # Without a live client the answer is just "connection failed"; never persist that
+        persist = getattr(ai, "client", None) is not None
+
+        cached = self._assessment_cache.get(provider, model, res_type) if persist else None
+        if cached is not None:
+            self._type_cache[res_type] = cached
+            return cached
         
-        from services.ai_service import AIService
         try:
-            ai = AIService()
             result = ai.assess_migration_readiness(res_type)
             self._type_cache[res_type] = result
+            if persist:
+                self._assessment_cache.set(provider, model, res_type, result)
             return result
         except Exception as e:
             # Fallback for AI failure (Rate Limit, etc.)
@@ -83,18 +160,7 @@ class CompatibilityService:
             }
 
     def _human_readable_type(self, res_type: str) -> str:
-        """
-        Converts 'Microsoft.Compute/virtualMachines' to 'Virtual Machine'.
-        """
-        if not res_type: return "Unknown"
-        parts = res_type.split("/")
-        if len(parts) > 1:
-            # "virtualMachines" -> "Virtual Machines"
-            # Simple heuristic: SplitCase or just return last part capitalized
-            name = parts[-1]
-            # Simple space insertion for camelCase if needed, but for now just capitalizing
-            return name[0].upper() + name[1:]
-        return res_type
+        return _human_readable_type(res_type)
 
     def _generate_remark(self, can_move: str, res_type: str, existing_issues: List[str] = None) -> tuple[str, str]:
         """
@@ -118,12 +184,16 @@ class CompatibilityService:
             
         return "", "" # Should not happen if can_move is No but no issues, but safe fallback
 
-    def generate_detailed_report(self, resources: List[Dict[str, Any]], existing_blockers: Dict[str, List[str]] = None) -> List[Dict[str, Any]]:
+    def generate_detailed_report(self, resources: List[Dict[str, Any]], existing_blockers: Dict[str, List[str]] = None) -> List[tuple]:
         """
-        Generates a flat list of dicts suitable for Excel export.
-        Refined column order: Name, Type, Can be moved, Resource Type, RG, Loc, Sub, Remarks.
+        Generates flat row tuples suitable for Excel export, ordered as DETAILED_REPORT_COLUMNS:
+        Name, Type, Can be moved, Resource Type, RG, Loc, Sub, Remarks.
+        Tuples (rather than per-row dicts) load straight into a DataFrame or worksheet.
         """
         detailed_rows = []
+        assessments = {}
+        if existing_blockers is None:
+            assessments = self._get_ai_assessments(r.get("type", "").lower() for r in resources)
         
         for res in resources:
             res_id = res.get("id")
@@ -140,9 +210,9 @@ class CompatibilityService:
             
             # Fallback to fresh assessment (Slow Path)
             else:
-                instance_issues = self.check_resource(res)
+                instance_issues = format_blockers(self.check_resource(res))
                 res_type_lower = res_type_full.lower()
-                ai_result = self._get_ai_assessment(res_type_lower)
+                ai_result = assessments[res_type_lower]
                 is_supported = ai_result.get("supported", False)
                 
                 if instance_issues:
@@ -160,21 +230,18 @@ class CompatibilityService:
             final_can_move, final_remarks = self._generate_remark(initial_can_move, res_type_full, issues)
 
             # Subscription Parsing
-            try:
-                subscription = res["id"].split("/")[2]
-            except:
-                subscription = "unknown"
+            m = _SUB_RE.match(res_id or "")
+            subscription = m.group(1) if m else "unknown"
 
             # Column Ordering: Name, Type, Can be moved, Resource Type, Resource Group, Location, Subscription, Remarks
-            row = {
-                "Name": res.get("name"),
-                "Type": self._human_readable_type(res_type_full), # Short Type
-                "Can be moved": final_can_move,
-                "Resource Type": res_type_full, # Full Type
-                "Resource Group": res.get("resource_group"),
-                "Location": res.get("location"),
-                "Subscription": subscription,
-                "Remarks": final_remarks
-            }
-            detailed_rows.append(row)
+            detailed_rows.append((
+                res.get("name"),
+                self._human_readable_type(res_type_full), # Short Type
+                final_can_move,
+                res_type_full, # Full Type
+                res.get("resource_group"),
+                res.get("location"),
+                subscription,
+                final_remarks
+            ))
         return detailed_rows
@@ -1,128 +1,221 @@
+import os
 import re
+import time
+import asyncio
 import logging
-import requests
+from itertools import islice
+import httpx
+import orjson
 from services.azure_connector import AzureConnector
 
 logger = logging.getLogger(__name__)
 
+ARM_ENDPOINT = "https://management.azure.com"
+
+# Upper bound on how long a single template export is polled
+EXPORT_POLL_TIMEOUT = float(os.getenv("EXPORT_POLL_TIMEOUT", "600"))
+
+# Common API versions to try for generic resources, in order of preference
+FULL_RESOURCE_API_VERSIONS = ("2021-04-01", "2023-01-01", "2020-06-01", "2019-05-01")
+
+# Subscription quota id cleanup, e.g. PayAsYouGo_2014-09-01 -> Pay As You Go
+_DATE_SUFFIX_RE = re.compile(r'_\d{4}-\d{2}-\d{2}$')
+_CAMEL_SPLIT_RE = re.compile(r'(?<!^)(?=[A-Z])')
+
+# Concurrent Graph getByIds requests per resolution, and retries per chunk on 429
+GRAPH_CONCURRENCY = 10
+GRAPH_MAX_RETRIES = 3
+
+def _json(resp):
+    """Decodes a requests/httpx response body with orjson (much faster than stdlib json on large listings)."""
+    return orjson.loads(resp.content)
+
+def _retry_after(resp) -> float | None:
+    """Seconds from a Retry-After header, or None if absent or not a delay in seconds."""
+    try:
+        return float(resp.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+def _empty_context(subscription_id: str) -> dict:
+    return {
+        "tenant_name": "Standard Tenant",
+        "tenant_id": "Unknown",
+        "subscription_id": subscription_id,
+        "subscription_name": "Unknown",
+        "subscription_plan": "Pay-As-You-Go",
+        "cost_score": "Calculating...", 
+        "secure_score": "Calculating...", 
+        "resource_count": "Calculating..."
+    }
+
+def _context_paths(subscription_id: str) -> dict:
+    """ARM paths (relative to ARM_ENDPOINT) for the independent context lookups."""
+    return {
+        "tenants": "/tenants?api-version=2020-01-01",
+        "resources": f"/subscriptions/{subscription_id}/resources?api-version=2021-04-01&$select=id",
+        # Only the overall score is shown, so fetch it by name rather than listing every initiative
+        "secure": f"/subscriptions/{subscription_id}/providers/Microsoft.Security/secureScores/ascScore?api-version=2020-01-01",
+        "advisor": f"/subscriptions/{subscription_id}/providers/Microsoft.Advisor/recommendations?api-version=2020-01-01&$filter=category eq 'Cost'",
+    }
+
 class ContextService:
     def __init__(self, connector: AzureConnector):
         self.connector = connector
 
-    def get_context_data(self, subscription_id: str):
+    async def get_context_data_async(self, http: httpx.AsyncClient, subscription_id: str):
         """
         Fetches comprehensive context about the Azure environment.
+        The ARM lookups go out as one batch request, concurrently with the
+        subscription details, so latency is a single round trip rather than five.
         """
-        data = {
-            "tenant_name": "Standard Tenant",
-            "tenant_id": "Unknown",
-            "subscription_id": subscription_id,
-            "subscription_name": "Unknown",
-            "subscription_plan": "Pay-As-You-Go",
-            "cost_score": "Calculating...", 
-            "secure_score": "Calculating...", 
-            "resource_count": "Calculating..."
-        }
+        data = _empty_context(subscription_id)
 
         try:
-            token = self.connector.get_token()
+            token = await asyncio.to_thread(self.connector.get_token)
             headers = {"Authorization": f"Bearer {token}"}
+            paths = _context_paths(subscription_id)
 
-            # 1. Subscription Details
-            sub_details = self.connector.get_subscription_details(subscription_id)
-            data["subscription_name"] = sub_details.get("displayName", "Unknown")
-            data["tenant_id"] = sub_details.get("tenantId", "Unknown")
+            sub_details, responses = await asyncio.gather(
+                asyncio.to_thread(self.connector.get_subscription_details, subscription_id),
+                self._arm_batch_get(http, headers, paths),
+                return_exceptions=True,
+            )
+            if isinstance(responses, BaseException):
+                raise responses
+            if isinstance(sub_details, BaseException):
+                raise sub_details
+
+            self._fill_context(data, sub_details, responses)
+        except Exception as e:
+            logger.error(f"Context fetch failed: {e}")
             
-            # Format Plan Name
-            policies = sub_details.get("subscriptionPolicies", {})
-            quota_id = policies.get("quotaId", "Pay-As-You-Go")
-            # Cleanup: Remove dates and underscores (e.g., PayAsYouGo_2014-09-01 -> Pay As You Go)
-            clean_plan = re.sub(r'_\d{4}-\d{2}-\d{2}$', '', quota_id) # Remove date suffix
-            clean_plan = re.sub(r'(?<!^)(?=[A-Z])', ' ', clean_plan) # Add spaces before caps
-            data["subscription_plan"] = clean_plan
-
-            # Try to fetch Tenant Name
-            try:
-                ten_url = "https://management.azure.com/tenants?api-version=2020-01-01"
-                ten_resp = requests.get(ten_url, headers=headers, timeout=3)
-                if ten_resp.status_code == 200:
-                    tenants = ten_resp.json().get("value", [])
-                    # Find matching tenant
-                    matching_tenant = next((t for t in tenants if t["tenantId"] == data["tenant_id"]), None)
-                    if matching_tenant:
-                        data["tenant_name"] = matching_tenant.get("displayName", "Standard Tenant")
-            except Exception:
-                pass # Fallback
+        return data
 
-            # 2. Resource Count (Lightweight)
-            try:
-                res_url = f"https://management.azure.com/subscriptions/{subscription_id}/resources?api-version=2021-04-01&$select=id"
-                res_resp = requests.get(res_url, headers=headers, timeout=5)
-                if res_resp.status_code == 200:
-                    res_list = res_resp.json().get("value", [])
-                    data["resource_count"] = str(len(res_list))
-                else:
-                    data["resource_count"] = "Unknown"
-            except:
+    @staticmethod
+    def _fill_context(data: dict, sub_details: dict, responses: dict):
+        """
+        Fills `data` from the subscription details and the responses for each
+        _context_paths entry (a response object, or the exception its call raised).
+        """
+        ten_resp, res_resp, sec_resp, adv_resp = (
+            responses["tenants"], responses["resources"], responses["secure"], responses["advisor"]
+        )
+
+        # 1. Subscription Details
+        data["subscription_name"] = sub_details.get("displayName", "Unknown")
+        data["tenant_id"] = sub_details.get("tenantId", "Unknown")
+        
+        # Format Plan Name
+        policies = sub_details.get("subscriptionPolicies", {})
+        quota_id = policies.get("quotaId", "Pay-As-You-Go")
+        # Cleanup: Remove dates and underscores (e.g., PayAsYouGo_2014-09-01 -> Pay As You Go)
+        clean_plan = _DATE_SUFFIX_RE.sub('', quota_id) # Remove date suffix
+        clean_plan = _CAMEL_SPLIT_RE.sub(' ', clean_plan) # Add spaces before caps
+        data["subscription_plan"] = clean_plan
+
+        # Try to fetch Tenant Name
+        try:
+            if isinstance(ten_resp, BaseException):
+                raise ten_resp
+            if ten_resp.status_code == 200:
+                tenants = _json(ten_resp).get("value", [])
+                # Find matching tenant
+                matching_tenant = next((t for t in tenants if t["tenantId"] == data["tenant_id"]), None)
+                if matching_tenant:
+                    data["tenant_name"] = matching_tenant.get("displayName", "Standard Tenant")
+        except Exception:
+            pass # Fallback
+
+        # 2. Resource Count (Lightweight)
+        try:
+            if isinstance(res_resp, BaseException):
+                raise res_resp
+            if res_resp.status_code == 200:
+                res_list = _json(res_resp).get("value", [])
+                data["resource_count"] = str(len(res_list))
+            else:
                 data["resource_count"] = "Unknown"
+        except:
+            data["resource_count"] = "Unknown"
 
-            # 3. Secure Score (Microsoft.Security)
-            try:
-                sec_url = f"https://management.azure.com/subscriptions/{subscription_id}/providers/Microsoft.Security/secureScores?api-version=2020-01-01"
-                sec_resp = requests.get(sec_url, headers=headers, timeout=3)
-                if sec_resp.status_code == 200:
-                    scores = sec_resp.json().get("value", [])
-                    main_score = next((s for s in scores if s["name"] == "ascScore"), None)
-                    if main_score:
-                        current = main_score.get("properties", {}).get("score", {}).get("current", 0)
-                        max_s = main_score.get("properties", {}).get("score", {}).get("max", 0)
-                        percentage = round((current / max_s) * 100) if max_s > 0 else 0
-                        data["secure_score"] = f"{percentage}%"
-                    else:
-                        data["secure_score"] = "Not Configured"
-                else:
-                    data["secure_score"] = "Unavailable"
-            except Exception as e:
-                logger.warning(f"Secure Score Fetch failed: {e}")
+        # 3. Secure Score (Microsoft.Security)
+        try:
+            if isinstance(sec_resp, BaseException):
+                raise sec_resp
+            if sec_resp.status_code == 200:
+                main_score = _json(sec_resp)
+                current = main_score.get("properties", {}).get("score", {}).get("current", 0)
+                max_s = main_score.get("properties", {}).get("score", {}).get("max", 0)
+                percentage = round((current / max_s) * 100) if max_s > 0 else 0
+                data["secure_score"] = f"{percentage}%"
+            elif sec_resp.status_code == 404:
+                data["secure_score"] = "Not Configured"
+            else:
                 data["secure_score"] = "Unavailable"
+        except Exception as e:
+            logger.warning(f"Secure Score Fetch failed: {e}")
+            data["secure_score"] = "Unavailable"
 
-            # 4. Cost (Advisor) - Potential Savings
-            try:
-                adv_url = f"https://management.azure.com/subscriptions/{subscription_id}/providers/Microsoft.Advisor/recommendations?api-version=2020-01-01&$filter=category eq 'Cost'"
-                adv_resp = requests.get(adv_url, headers=headers, timeout=3)
-                if adv_resp.status_code == 200:
-                    recs = adv_resp.json().get("value", [])
-                    total_savings = 0.0
-                    for r in recs:
-                        props = r.get("properties", {})
-                        ext = props.get("extendedProperties", {})
-                        savings = ext.get("savingsAmount")
-                        if savings:
-                            try:
-                                total_savings += float(savings)
-                            except: pass
-                    
-                    if total_savings > 0:
-                        data["cost_score"] = f"Potential Savings: ${total_savings:,.2f}/yr"
-                    else:
-                        data["cost_score"] = "Optimized"
+        # 4. Cost (Advisor) - Potential Savings
+        try:
+            if isinstance(adv_resp, BaseException):
+                raise adv_resp
+            if adv_resp.status_code == 200:
+                recs = _json(adv_resp).get("value", [])
+                total_savings = 0.0
+                for r in recs:
+                    props = r.get("properties", {})
+                    ext = props.get("extendedProperties", {})
+                    savings = ext.get("savingsAmount")
+                    if savings:
+                        try:
+                            total_savings += float(savings)
+                        except: pass
+                
+                if total_savings > 0:
+                    data["cost_score"] = f"Potential Savings: ${total_savings:,.2f}/yr"
                 else:
-                    data["cost_score"] = "Unavailable"
-            except Exception as e:
-                 logger.warning(f"Advisor Fetch failed: {e}")
-                 data["cost_score"] = "Unavailable"
+                    data["cost_score"] = "Optimized"
+            else:
+                data["cost_score"] = "Unavailable"
+        except Exception as e:
+             logger.warning(f"Advisor Fetch failed: {e}")
+             data["cost_score"] = "Unavailable"
 
+    async def _arm_batch_get(self, http: httpx.AsyncClient, headers: dict, paths: dict) -> dict:
+        """
+        Runs several ARM GETs as one request via the batch endpoint, so they share a
+        single round trip and throttling decrement. Returns name -> httpx.Response
+        (or the exception raised for that call). If the batch call itself doesn't
+        complete synchronously, the GETs are issued individually and concurrently.
+        """
+        payload = {"requests": [{"httpMethod": "GET", "name": name, "url": path} for name, path in paths.items()]}
+        try:
+            resp = await http.post(f"{ARM_ENDPOINT}/batch?api-version=2020-06-01", headers=headers, json=payload, timeout=5)
+            if resp.status_code == 200:
+                results = {
+                    r.get("name"): httpx.Response(r.get("httpStatusCode", 500), json=r.get("content"))
+                    for r in _json(resp).get("responses", [])
+                }
+                if all(name in results for name in paths):
+                    return results
         except Exception as e:
-            logger.error(f"Context fetch failed: {e}")
-            
-        return data
+            logger.warning(f"ARM batch request failed, falling back to individual calls: {e}")
 
-    def export_resource_template(self, subscription_id: str, resource_group: str, resources: list[str]):
+        responses = await asyncio.gather(
+            *(http.get(f"{ARM_ENDPOINT}{path}", headers=headers, timeout=5) for path in paths.values()),
+            return_exceptions=True,
+        )
+        return dict(zip(paths, responses))
+
+    async def export_resource_template(self, http: httpx.AsyncClient, subscription_id: str, resource_group: str, resources: list[str]):
         """
         Uses the official Azure Management API to export a template for specific resources.
         POST https://management.azure.com/subscriptions/{sub}/resourceGroups/{rg}/exportTemplate?api-version=2021-04-01
+        `http` is shared by the caller so concurrent exports reuse one connection pool.
         """
-        token = self.connector.get_token()
+        token = await asyncio.to_thread(self.connector.get_token)
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json"
@@ -138,25 +231,29 @@ class ContextService:
         try:
             # this is a long running operation, usually returns 202 Accepted + Location header
             # But for small sets it might return 200 OK.
-            resp = requests.post(url, headers=headers, json=payload)
+            resp = await http.post(url, headers=headers, json=payload)
             
             if resp.status_code == 200:
-                return resp.json()
+                return _json(resp)
             elif resp.status_code == 202:
                 # Poll logic
                 location = resp.headers.get("Location")
                 if not location:
                      return {"error": "Async operation accepted but no Location header found."}
                 
-                # Poll URL
-                import time
-                for _ in range(10): # Try for 20 seconds
-                    time.sleep(2)
-                    poll_resp = requests.get(location, headers=headers)
-                    if poll_resp.status_code == 200:
-                        return poll_resp.json()
-                    if poll_resp.status_code != 202:
-                        return {"error": f"Polling failed: {poll_resp.text}"}
+                # Poll URL: start fast (small exports finish in about a second), then back off,
+                # letting Azure's Retry-After pace us whenever it sends one
+                deadline = time.monotonic() + EXPORT_POLL_TIMEOUT
+                delay = 1.0
+                while time.monotonic() < deadline:
+                    retry_after = _retry_after(resp)
+                    await asyncio.sleep(delay if retry_after is None else retry_after)
+                    delay = min(delay * 1.5, 10.0)
+                    resp = await http.get(location, headers=headers)
+                    if resp.status_code == 200:
+                        return _json(resp)
+                    if resp.status_code not in (202, 429):
+                        return {"error": f"Polling failed: {resp.text}"}
                 
                 return {"error": "Export timed out (polling)"}
             else:
@@ -172,10 +269,7 @@ class ContextService:
         """
         client = self.connector.get_resource_client(subscription_id)
         
-        # List of common API versions to try for generic resources
-        versions_to_try = ["2021-04-01", "2023-01-01", "2020-06-01"]
-        
-        for version in versions_to_try:
+        for version in FULL_RESOURCE_API_VERSIONS:
             try:
                 res = client.resources.get_by_id(resource_id, version)
                 return res.as_dict()
@@ -183,12 +277,7 @@ class ContextService:
                 continue
                 
         # If all fail, return basic dict (missing properties likely, but better than crash)
-        # Or try one last '2019-05-01'
-        try:
-             res = client.resources.get_by_id(resource_id, "2019-05-01")
-             return res.as_dict()
-        except:
-            return {} 
+        return {} 
 
     def get_role_assignments(self, subscription_id: str):
         """
@@ -200,9 +289,9 @@ class ContextService:
             headers = {"Authorization": f"Bearer {token}"}
             # List all role assignments for the subscription
             url = f"https://management.azure.com/subscriptions/{subscription_id}/providers/Microsoft.Authorization/roleAssignments?api-version=2022-04-01"
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = self.connector.http.get(url, headers=headers, timeout=10)
             if resp.status_code == 200:
-                return resp.json().get("value", [])
+                return _json(resp).get("value", [])
             return []
         except Exception as e:
             logger.error(f"Failed to fetch RBAC: {e}")
@@ -216,9 +305,9 @@ class ContextService:
             token = self.connector.get_token()
             headers = {"Authorization": f"Bearer {token}"}
             url = f"https://management.azure.com/subscriptions/{subscription_id}/providers/Microsoft.Network/publicIPAddresses?api-version=2022-07-01"
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = self.connector.http.get(url, headers=headers, timeout=10)
             if resp.status_code == 200:
-                return resp.json().get("value", [])
+                return _json(resp).get("value", [])
             return []
         except Exception as e:
             logger.error(f"Failed to fetch PIPs: {e}")
@@ -233,9 +322,9 @@ class ContextService:
             headers = {"Authorization": f"Bearer {token}"}
             # Use stable version 2021-07-01
             url = f"https://management.azure.com/subscriptions/{subscription_id}/providers/Microsoft.Compute/virtualMachines?api-version=2021-07-01&$expand=instanceView"
-            resp = requests.get(url, headers=headers, timeout=20)
+            resp = self.connector.http.get(url, headers=headers, timeout=20)
             if resp.status_code == 200:
-                return resp.json().get("value", [])
+                return _json(resp).get("value", [])
             logger.error(f"VM Fetch Error {resp.status_code}: {resp.text}")
             return []
         except Exception as e:
@@ -250,10 +339,10 @@ class ContextService:
             token = self.connector.get_token()
             headers = {"Authorization": f"Bearer {token}"}
             url = f"https://management.azure.com/subscriptions/{subscription_id}/providers/Microsoft.Authorization/roleDefinitions?api-version=2022-04-01"
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = self.connector.http.get(url, headers=headers, timeout=10)
             mapping = {}
             if resp.status_code == 200:
-                for role in resp.json().get("value", []):
+                for role in _json(resp).get("value", []):
                     # role["id"] is full ID, but assignment usually refs full ID too.
                     # Or sometimes user needs just the name. 
                     mapping[role["id"]] = role["properties"]["roleName"] # Full ID match
@@ -263,54 +352,69 @@ class ContextService:
             logger.error(f"Failed to fetch Role Defs: {e}")
             return {}
 
-    def resolve_principals(self, principal_ids: list) -> dict:
+    async def resolve_principals_async(self, http: httpx.AsyncClient, principal_ids: list) -> dict:
         """
         Resolves a list of Principal IDs to {Display Name, SignIn Name/Email} using Microsoft Graph.
         Returns map: PrincipalId -> {displayName, signInName, objectType}
+        Chunks are posted concurrently (bounded by GRAPH_CONCURRENCY), backing off on 429.
         """
         if not principal_ids: return {}
         
         mapping = {}
-        unique_ids = list(set(principal_ids))
+        # Order-preserving dedup in one pass
+        unique_ids = dict.fromkeys(principal_ids)
         
         try:
             # Use Graph Token
-            token = self.connector.get_token("https://graph.microsoft.com/.default")
-            headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-            
-            # Graph API allows batching via `directoryObjects/getByIds`
-            # Limit is 1000 per request.
-            
-            # Batching logic
-            chunk_size = 900
-            for i in range(0, len(unique_ids), chunk_size):
-                chunk = unique_ids[i:i + chunk_size]
-                payload = {
-                    "ids": chunk,
-                    "types": ["user", "group", "servicePrincipal"]
-                }
-                
-                resp = requests.post("https://graph.microsoft.com/v1.0/directoryObjects/getByIds", headers=headers, json=payload)
-                
-                if resp.status_code == 200:
-                    for obj in resp.json().get("value", []):
-                        pid = obj["id"]
-                        d_name = obj.get("displayName", "Unknown")
-                        s_name = obj.get("userPrincipalName") or obj.get("mail") or "N/A" # UPN for users
-                        
-                        if obj.get("@odata.type") == "#microsoft.graph.servicePrincipal":
-                             s_name = obj.get("appId", "N/A") # AppID for SPs
-                        
-                        mapping[pid] = {
-                            "displayName": d_name,
-                            "signInName": s_name,
-                            "objectType": obj.get("@odata.type", "").replace("#microsoft.graph.", "")
-                        }
-                else:
-                    logger.warning(f"Graph API Error {resp.status_code}: {resp.text}")
-                    
+            token = await asyncio.to_thread(self.connector.get_token, "https://graph.microsoft.com/.default")
         except Exception as e:
             logger.error(f"Graph API Resolution Failed: {e}")
-            # If Graph fails (e.g. permission denied), return empty map, main loop defaults to ID
+            return mapping
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        slots = asyncio.Semaphore(GRAPH_CONCURRENCY)
+
+        async def post_chunk(chunk: list):
+            payload = {
+                "ids": chunk,
+                "types": ["user", "group", "servicePrincipal"]
+            }
+            async with slots:
+                for attempt in range(GRAPH_MAX_RETRIES + 1):
+                    resp = await http.post("https://graph.microsoft.com/v1.0/directoryObjects/getByIds", headers=headers, json=payload)
+                    if resp.status_code != 429 or attempt == GRAPH_MAX_RETRIES:
+                        break
+                    retry_after = _retry_after(resp)
+                    await asyncio.sleep(2 ** attempt if retry_after is None else retry_after)
+
+            if resp.status_code != 200:
+                logger.warning(f"Graph API Error {resp.status_code}: {resp.text}")
+                return
+
+            for obj in _json(resp).get("value", []):
+                pid = obj["id"]
+                d_name = obj.get("displayName", "Unknown")
+                s_name = obj.get("userPrincipalName") or obj.get("mail") or "N/A" # UPN for users
+                
+                if obj.get("@odata.type") == "#microsoft.graph.servicePrincipal":
+                     s_name = obj.get("appId", "N/A") # AppID for SPs
+                
+                mapping[pid] = {
+                    "displayName": d_name,
+                    "signInName": s_name,
+                    "objectType": obj.get("@odata.type", "").replace("#microsoft.graph.", "")
+                }
+
+        # Graph API allows batching via `directoryObjects/getByIds`
+        # Limit is 1000 per request.
+        chunk_size = 900
+        ids = iter(unique_ids)
+        chunks = []
+        while chunk := list(islice(ids, chunk_size)):
+            chunks.append(chunk)
+        results = await asyncio.gather(*(post_chunk(c) for c in chunks), return_exceptions=True)
+        for r in results:
+            if isinstance(r, Exception):
+                # If Graph fails (e.g. permission denied), the caller defaults to the raw ID
+                logger.error(f"Graph API Resolution Failed: {r}")
             
-        return mapping 
+        return mapping
@@ -1,43 +1,78 @@
-from typing import List, Dict, Set, Any
+from collections import OrderedDict, defaultdict
+from typing import AbstractSet, Iterable, List, Dict, Set, Any
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Validation is retried and repeated per batch against the same job snapshot, so
+# built resolvers are kept per job id (a job's snapshot is written once), least
+# recently used first out
+RESOLVER_CACHE_MAX_SIZE = 8
+_resolver_cache: OrderedDict = OrderedDict()
+_resolver_cache_lock = threading.Lock()
+
+def normalize_ids(resource_ids: Iterable[str]) -> frozenset:
+    """Lower-cased, trimmed resource ids, matching the resolver's graph keys."""
+    return frozenset(rid.strip().lower() for rid in resource_ids)
+
 class DependencyResolver:
     """
     Service for analyzing resource dependencies, sorting them, 
     and ensuring migration batches are complete.
     """
 
-    def __init__(self, inventory_data: Dict[str, Any]):
-        self.resources = {r["id"].lower(): r for r in inventory_data.get("resources", [])}
-        self.edges = inventory_data.get("dependencies", [])
+    def __init__(self, resources: List[Dict[str, Any]], dependencies: List[Dict[str, str]]):
+        self.resources = {r["id"].lower(): r for r in resources}
+        self.edges = dependencies
         
-        # Build Adjacency List
-        # graph[u] = [v, w] means u depends on v and w
-        self.graph = {r_id: set() for r_id in self.resources}
+        # Build Adjacency List in one pass over the edges
+        # graph[u] = {v, w} means u depends on v and w; resources without dependencies have no entry
+        self.graph = defaultdict(set)
+        resources = self.resources
         for edge in self.edges:
             src = edge["source"].lower()
             tgt = edge["target"].lower()
-            if src in self.graph and tgt in self.resources:
+            if src in resources and tgt in resources:
                 self.graph[src].add(tgt)
 
-    def get_missing_dependencies(self, selected_ids: List[str]) -> List[str]:
+    @classmethod
+    def for_snapshot(cls, inventory_data: Dict[str, Any], snapshot_id: str = None) -> "DependencyResolver":
+        """
+        Returns a resolver for the snapshot, reusing the one already built for the same snapshot id.
+        Without an id the resolver is built fresh and not cached.
+        """
+        if snapshot_id is None:
+            return cls(inventory_data.get("resources", []), inventory_data.get("dependencies", []))
+
+        with _resolver_cache_lock:
+            resolver = _resolver_cache.get(snapshot_id)
+            if resolver:
+                _resolver_cache.move_to_end(snapshot_id)
+                return resolver
+
+        resolver = cls(inventory_data.get("resources", []), inventory_data.get("dependencies", []))
+        with _resolver_cache_lock:
+            _resolver_cache[snapshot_id] = resolver
+            _resolver_cache.move_to_end(snapshot_id)
+            while len(_resolver_cache) > RESOLVER_CACHE_MAX_SIZE:
+                _resolver_cache.popitem(last=False)
+        return resolver
+
+    def get_missing_dependencies(self, selected_ids: AbstractSet[str]) -> List[str]:
         """
         Identifies resources that are required by the selected batch 
         but are NOT included in the selection.
+        Expects ids already normalized with normalize_ids.
         """
-        selected_set = {rid.lower() for rid in selected_ids}
+        graph = self.graph
         missing = set()
 
-        for rid in selected_set:
-            if rid not in self.graph:
-                continue
-            
-            # Check all things 'rid' depends on
-            for dependency in self.graph[rid]:
-                if dependency not in selected_set:
-                    missing.add(dependency)
+        for rid in selected_ids:
+            deps = graph.get(rid)
+            if deps:
+                # Check all things 'rid' depends on
+                missing.update(deps.difference(selected_ids))
         
         return list(missing)
 
@@ -48,7 +83,7 @@ class DependencyResolver:
         (e.g., VNET -> Subnet -> NIC -> VM)
         """
         # Filter graph to only relevant nodes
-        subset_ids = {rid.lower() for rid in resource_ids if rid.lower() in self.resources}
+        subset_ids = {rid.lower() for rid in resource_ids} & self.resources.keys()
         
         # Calculate local in-degrees for the subgraph
         # In this context:
@@ -65,28 +100,35 @@ class DependencyResolver:
         # We want [B, A] (Creation Order).
         # So we want the REVERSE of the topological sort.
         
+        # Iterative post-order DFS: each stack frame is (node, iterator over its dependencies),
+        # so deep chains don't hit the recursion limit or pay per-call frame setup
+        graph = self.graph
         visited = set()
         stack = []
-        
-        def dfs(node):
-            visited.add(node)
-            if node in self.graph:
-                for neighbor in self.graph[node]:
-                    if neighbor in subset_ids and neighbor not in visited:
-                        dfs(neighbor)
-            stack.append(node)
 
         for rid in subset_ids:
-            if rid not in visited:
-                dfs(rid)
+            if rid in visited:
+                continue
+            visited.add(rid)
+            path = [(rid, iter(graph.get(rid, ())))]
+            while path:
+                node, deps = path[-1]
+                for neighbor in deps:
+                    if neighbor in subset_ids and neighbor not in visited:
+                        visited.add(neighbor)
+                        path.append((neighbor, iter(graph.get(neighbor, ()))))
+                        break
+                else:
+                    path.pop()
+                    stack.append(node)
 
         # Stack now contains [Dependency, ..., Dependent] because we post-order append.
-        # Let's trace: A -> B. DFS(A) calls DFS(B). DFS(B) finishes, checks children (none), pushes B. DFS(A) finishes, pushes A.
+        # Let's trace: A -> B. Visiting A descends into B. B has no children, so B is pushed; then A is pushed.
         # Stack: [B, A]. 
         # This corresponds to "Create B first, then A".
         # This is exactly what we want for "Ordered Batches" / IaC.
         
-        sorted_ids = stack 
-        
-        # internal lookup to return full objects
-        return [self.resources[rid] for rid in sorted_ids if rid in self.resources]
+        # internal lookup to return full objects; every id on the stack came from
+        # subset_ids, which is already restricted to known resources
+        resources = self.resources
+        return [resources[rid] for rid in stack]
@@ -1,14 +1,11 @@
 from typing import List, Dict, Any
+import io
 import json
+from functools import lru_cache
 
-class IaCService:
-    """
-    Generates Terraform code from Azure Resource Inventory.
-    Implements a basic "Reverse Engineering" of resources.
-    """
-
-    def generate_terraform(self, resources: List[Dict[str, Any]]) -> str:
-        tf_code = ["""
+# Built once at import. The resource templates go through str.format, so their
+# literal HCL braces are doubled; the provider preamble is written verbatim.
+_PROVIDER_TF = """
 terraform {
   required_providers {
     azurerm = {
@@ -21,75 +18,28 @@ terraform {
 provider "azurerm" {
   features {}
 }
-"""]
-        
-        # We need to ensure Resource Groups are created first
-        rgs = set()
-        for res in resources:
-            if res.get("resource_group"):
-                rgs.add((res["resource_group"], res["location"]))
-        
-        for rg_name, location in rgs:
-            tf_code.append(self._generate_rg(rg_name, location))
-
-        # Sort resources by type to group them in output (Dependency Sort passed in would be better, but Terraform handles DAG graph itself usually)
-        # We just dump them.
-        
-        for res in resources:
-            res_type = res.get("type", "").lower()
-            if "virtualnetworks" in res_type:
-                tf_code.append(self._generate_vnet(res))
-            elif "virtualmachines" in res_type:
-                tf_code.append(self._generate_vm(res))
-            elif "networkinterfaces" in res_type:
-                tf_code.append(self._generate_nic(res))
-            elif "storageaccounts" in res_type:
-                tf_code.append(self._generate_storage(res))
-            # Add more handlers as needed
-            
-        return "\n".join(tf_code)
-
-    def _sanitize(self, name: str) -> str:
-        return name.replace("-", "_").lower()
+"""
 
-    def _generate_rg(self, name: str, location: str) -> str:
-        return f"""
-resource "azurerm_resource_group" "{self._sanitize(name)}" {{
+_RG_TF = """
+resource "azurerm_resource_group" "{sane}" {{
   name     = "{name}"
   location = "{location}"
 }}
 """
 
-    def _generate_vnet(self, res: Dict) -> str:
-        name = res["name"]
-        rg = res["resource_group"]
-        loc = res["location"]
-        props = res.get("properties", {})
-        address_space = json.dumps(props.get("addressSpace", {}).get("addressPrefixes", ["10.0.0.0/16"]))
-        
-        return f"""
-resource "azurerm_virtual_network" "{self._sanitize(name)}" {{
+_VNET_TF = """
+resource "azurerm_virtual_network" "{sane}" {{
   name                = "{name}"
   location            = "{loc}"
-  resource_group_name = azurerm_resource_group.{self._sanitize(rg)}.name
+  resource_group_name = azurerm_resource_group.{rg}.name
   address_space       = {address_space}
 }}
 """
 
-    def _generate_vm(self, res: Dict) -> str:
-        name = res["name"]
-        rg = res["resource_group"]
-        loc = res["location"]
-        vm_size = res.get("sku", {}).get("name", "Standard_DS1_v2")
-        
-        # Simplified NIC attachment (assuming 1st NIC found in props)
-        # In real-world, we'd need to link to the actual NIC resource ID
-        nic_id = "TODO_LINK_NIC_ID"
-        
-        return f"""
-resource "azurerm_linux_virtual_machine" "{self._sanitize(name)}" {{
+_VM_TF = """
+resource "azurerm_linux_virtual_machine" "{sane}" {{
   name                = "{name}"
-  resource_group_name = azurerm_resource_group.{self._sanitize(rg)}.name
+  resource_group_name = azurerm_resource_group.{rg}.name
   location            = "{loc}"
   size                = "{vm_size}"
   admin_username      = "adminuser"
@@ -109,16 +59,11 @@ resource "azurerm_linux_virtual_machine" "{self._sanitize(name)}" {{
 }}
 """
 
-    def _generate_nic(self, res: Dict) -> str:
-        name = res["name"]
-        rg = res["resource_group"]
-        loc = res["location"]
-        
-        return f"""
-resource "azurerm_network_interface" "{self._sanitize(name)}" {{
+_NIC_TF = """
+resource "azurerm_network_interface" "{sane}" {{
   name                = "{name}"
   location            = "{loc}"
-  resource_group_name = azurerm_resource_group.{self._sanitize(rg)}.name
+  resource_group_name = azurerm_resource_group.{rg}.name
 
   ip_configuration {{
     name                          = "internal"
@@ -128,22 +73,104 @@ resource "azurerm_network_interface" "{self._sanitize(name)}" {{
 }}
 """
 
+_STORAGE_TF = """
+resource "azurerm_storage_account" "{sane}" {{
+  name                     = "{name}"
+  resource_group_name      = azurerm_resource_group.{rg}.name
+  location                 = "{loc}"
+  account_tier             = "{tier}"
+  account_replication_type = "{repl}"
+}}
+"""
+
+class IaCService:
+    """
+    Generates Terraform code from Azure Resource Inventory.
+    Implements a basic "Reverse Engineering" of resources.
+    """
+
+    def generate_terraform(self, resources: List[Dict[str, Any]]) -> str:
+        # Blocks are streamed into one buffer instead of collected and joined
+        buf = io.StringIO()
+        write = buf.write
+        write(_PROVIDER_TF)
+        
+        # We need to ensure Resource Groups are created first
+        rgs = set()
+        for res in resources:
+            if res.get("resource_group"):
+                rgs.add((res["resource_group"], res["location"]))
+        
+        for rg_name, location in rgs:
+            write("\n")
+            write(self._generate_rg(rg_name, location))
+
+        # Sort resources by type to group them in output (Dependency Sort passed in would be better, but Terraform handles DAG graph itself usually)
+        # We just dump them.
+        
+        generators = self._GENERATORS
+        for res in resources:
+            generate = generators.get(res.get("type", "").lower())
+            if generate:
+                write("\n")
+                write(generate(self, res))
+            
+        return buf.getvalue()
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _sanitize(name: str) -> str:
+        # Resource group names repeat across most resources, so this is mostly cache hits
+        return name.replace("-", "_").lower()
+
+    def _generate_rg(self, name: str, location: str) -> str:
+        return _RG_TF.format(sane=self._sanitize(name), name=name, location=location)
+
+    def _generate_vnet(self, res: Dict) -> str:
+        name = res["name"]
+        props = res.get("properties", {})
+        address_space = json.dumps(props.get("addressSpace", {}).get("addressPrefixes", ["10.0.0.0/16"]))
+        
+        return _VNET_TF.format(
+            sane=self._sanitize(name), name=name, loc=res["location"],
+            rg=self._sanitize(res["resource_group"]), address_space=address_space,
+        )
+
+    def _generate_vm(self, res: Dict) -> str:
+        name = res["name"]
+        vm_size = res.get("sku", {}).get("name", "Standard_DS1_v2")
+        
+        # Simplified NIC attachment (assuming 1st NIC found in props)
+        # In real-world, we'd need to link to the actual NIC resource ID
+        return _VM_TF.format(
+            sane=self._sanitize(name), name=name, loc=res["location"],
+            rg=self._sanitize(res["resource_group"]), vm_size=vm_size,
+        )
+
+    def _generate_nic(self, res: Dict) -> str:
+        name = res["name"]
+        return _NIC_TF.format(
+            sane=self._sanitize(name), name=name, loc=res["location"],
+            rg=self._sanitize(res["resource_group"]),
+        )
+
     def _generate_storage(self, res: Dict) -> str:
         name = res["name"]
-        rg = res["resource_group"]
-        loc = res["location"]
         sku = res.get("sku", {}).get("name", "Standard_LRS") # Standard_LRS
         # Split Standard_LRS -> tier=Standard, replication=LRS
         parts = sku.split("_")
         tier = parts[0] if len(parts) > 0 else "Standard"
         repl = parts[1] if len(parts) > 1 else "LRS"
 
-        return f"""
-resource "azurerm_storage_account" "{self._sanitize(name)}" {{
-  name                     = "{name}"
-  resource_group_name      = azurerm_resource_group.{self._sanitize(rg)}.name
-  location                 = "{loc}"
-  account_tier             = "{tier}"
-  account_replication_type = "{repl}"
-}}
-"""
+        return _STORAGE_TF.format(
+            sane=self._sanitize(name), name=name, loc=res["location"],
+            rg=self._sanitize(res["resource_group"]), tier=tier, repl=repl,
+        )
+
+    # Resource type (lowercase) -> generator. Add more handlers as needed
+    _GENERATORS = {
+        "microsoft.network/virtualnetworks": _generate_vnet,
+        "microsoft.compute/virtualmachines": _generate_vm,
+        "microsoft.network/networkinterfaces": _generate_nic,
+        "microsoft.storage/storageaccounts": _generate_storage,
+    }
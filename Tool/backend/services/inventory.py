@@ -1,9 +1,78 @@
 from .azure_connector import AzureConnector
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
+import contextlib
 import logging
+import queue
+import sys
+import threading
 
 logger = logging.getLogger(__name__)
 
+# How many resources may be fetched ahead of the consumer (ARM pages hold up to 1000)
+PREFETCH_ITEMS = 2000
+# How often a blocked producer checks whether the consumer has gone away (seconds)
+PREFETCH_STOP_POLL = 0.5
+
+_DONE = object()
+
+# Case-insensitive spellings of a bare "id" key
+_ID_KEYS = frozenset({"id", "Id", "ID", "iD"})
+
+def _intern(value):
+    """
+    Interns low-cardinality strings (types, regions, resource groups) so the
+    thousands of records in a scan share one copy of each instead of one per resource.
+    """
+    return sys.intern(value) if type(value) is str else value
+
+@contextlib.contextmanager
+def _prefetch(iterable: Iterable, depth: int = PREFETCH_ITEMS) -> Iterator[Iterator]:
+    """
+    Drains `iterable` on a background thread into a bounded queue.
+    Azure SDK pagers only request the next page once the current one is consumed,
+    so this keeps the next nextLink request in flight while the caller converts items.
+    Exceptions from the pager are re-raised in the consuming thread.
+    Leaving the block stops the producer, even if the consumer gave up early.
+    """
+    buf: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # A plain put() would block forever once nobody is reading
+        while not stop.is_set():
+            try:
+                buf.put(item, timeout=PREFETCH_STOP_POLL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(e)
+            return
+        put(_DONE)
+
+    def consume():
+        while True:
+            item = buf.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    # Started eagerly (not on first next()) so fetching begins immediately
+    threading.Thread(target=produce, name="inventory-prefetch", daemon=True).start()
+    try:
+        yield consume()
+    finally:
+        stop.set()
+
 class InventoryService:
     def __init__(self, connector: AzureConnector):
         self.connector = connector
@@ -14,6 +83,7 @@ class InventoryService:
         Returns a dictionary containing list of resource groups and their resources.
         """
         client = self.connector.get_resource_client(subscription_id)
+
         inventory = {
             "subscription_id": subscription_id,
             "resource_groups": [],
@@ -21,38 +91,40 @@ class InventoryService:
             "resources": []
         }
 
-        # 1. List Resource Groups
-        logger.info(f"Scanning Resource Groups for subscription {subscription_id}...")
-        rgs = list(client.resource_groups.list())
-        for rg in rgs:
-            rg_data = {
-                "name": rg.name,
-                "location": rg.location,
-                "tags": rg.tags
-            }
-            inventory["resource_groups"].append(rg_data)
-
-        # 2. List All Resources
-        # We can use list_by_resource_group to map them better, but list() at sub level is faster for overview
-        logger.info("Scanning Resources...")
+        # Start paging resources now so it overlaps the resource group listing below
         # Expand createdTime and changedTime if available
-        resources = list(client.resources.list(expand="createdTime,changedTime"))
-        
-        for res in resources:
-            res_data = {
-                "id": res.id,
-                "name": res.name,
-                "type": res.type,
-                "location": res.location,
-                "sku": res.sku.as_dict() if res.sku else None,
-                "kind": res.kind,
-                "tags": res.tags,
-                "resource_group": res.id.split("/resourceGroups/")[1].split("/")[0] if "/resourceGroups/" in res.id else None,
-                "properties": res.as_dict().get("properties", {})
-            }
-            inventory["resources"].append(res_data)
-
-        inventory["total_resources"] = len(inventory["resources"])
+        with _prefetch(client.resources.list(expand="createdTime,changedTime")) as resources:
+            # 1. List Resource Groups
+            logger.info(f"Scanning Resource Groups for subscription {subscription_id}...")
+            for rg in client.resource_groups.list():
+                rg_data = {
+                    "name": rg.name,
+                    "location": rg.location,
+                    "tags": rg.tags
+                }
+                inventory["resource_groups"].append(rg_data)
+
+            # 2. List All Resources
+            # We can use list_by_resource_group to map them better, but list() at sub level is faster for overview
+            logger.info("Scanning Resources...")
+            # Convert page by page as the pager yields; SDK models are dropped as soon as
+            # they're converted, so only the plain-dict inventory is held in full
+            resources_out = inventory["resources"]
+            for res in resources:
+                res_data = {
+                    "id": res.id,
+                    "name": res.name,
+                    "type": _intern(res.type),
+                    "location": _intern(res.location),
+                    "sku": res.sku.as_dict() if res.sku else None,
+                    "kind": _intern(res.kind),
+                    "tags": res.tags,
+                    "resource_group": _intern(res.id.split("/resourceGroups/")[1].split("/")[0]) if "/resourceGroups/" in res.id else None,
+                    "properties": res.as_dict().get("properties", {})
+                }
+                resources_out.append(res_data)
+
+        inventory["total_resources"] = len(resources_out)
         
         # 3. Build Dependency Graph
         logger.info("Building Dependency Graph...")
@@ -72,19 +144,35 @@ class InventoryService:
         for res in resources:
             source_id = res["id"]
             props = res.get("properties", {})
-            self._find_refs_recursive(props, source_id, resource_ids, edges)
+            self._find_refs(props, source_id, resource_ids, edges)
         
         return edges
 
-    def _find_refs_recursive(self, obj: Any, source_id: str, known_ids: set, edges: list):
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                if isinstance(v, str) and (k.lower() == "id" or k.endswith("Id")):
-                    clean_v = v.lower()
-                    if clean_v in known_ids and clean_v != source_id.lower():
-                        edges.append({"source": source_id, "target": v, "relation": "property_ref"})
-                else:
-                    self._find_refs_recursive(v, source_id, known_ids, edges)
-        elif isinstance(obj, list):
-            for item in obj:
-                self._find_refs_recursive(item, source_id, known_ids, edges)
+    def _find_refs(self, root: Any, source_id: str, known_ids: set, edges: list):
+        """
+        Walks a property tree with an explicit stack (deep trees can't hit the
+        recursion limit) and appends an edge for every id-like key that names
+        another known resource.
+        """
+        source_lc = source_id.lower()
+        append = edges.append
+        stack = [root]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            obj = pop()
+            t = type(obj)
+            if t is dict:
+                for k, v in obj.items():
+                    tv = type(v)
+                    if tv is str:
+                        # Resource ids always start with "/"; skip GUIDs, names, enums etc.
+                        # before paying for the lowercase copy
+                        if v[:1] == "/" and (k in _ID_KEYS or k.endswith("Id")):
+                            clean_v = v.lower()
+                            if clean_v in known_ids and clean_v != source_lc:
+                                append({"source": source_id, "target": v, "relation": "property_ref"})
+                    elif tv is dict or tv is list:
+                        push(v)
+            elif t is list:
+                stack.extend(obj)
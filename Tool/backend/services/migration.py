@@ -1,13 +1,35 @@
 from .azure_connector import AzureConnector
-from .dependency_resolver import DependencyResolver
+from .dependency_resolver import DependencyResolver, normalize_ids
 from azure.core.exceptions import HttpResponseError
+from azure.core.polling.base_polling import BadStatus, BadResponse
+from azure.mgmt.core.polling.arm_polling import ARMPolling
 from azure.mgmt.resource.resources.models import ResourcesMoveInfo
 import logging
 from typing import List, Dict, Any
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
 
 logger = logging.getLogger(__name__)
 
+# Throttling and server-side failures are worth retrying; other 4xx errors won't change
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+def _is_transient(exc: BaseException) -> bool:
+    return isinstance(exc, HttpResponseError) and exc.status_code in _RETRYABLE_STATUS
+
+class _SingleStatusCheck(ARMPolling):
+    """
+    ARM polling that issues one status request per rehydrated poller instead of
+    looping until the operation ends, so checking a move never blocks a worker.
+    """
+
+    def run(self) -> None:
+        try:
+            if not self.finished():
+                self.update_status()
+        except (BadStatus, BadResponse) as err:
+            self._status = "Failed"
+            raise HttpResponseError(response=self._pipeline_response.http_response, error=err) from err
+
 class MigrationService:
     def __init__(self, connector: AzureConnector):
         self.connector = connector
@@ -15,19 +37,20 @@ class MigrationService:
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type(HttpResponseError),
+        retry=retry_if_exception(_is_transient),
         reraise=True
     )
-    def validate_move(self, source_subscription_id: str, source_rg: str, target_rg_id: str, resource_ids: List[str], inventory_snapshot: Dict[str, Any] = None) -> Dict[str, Any]:
+    def validate_move(self, source_subscription_id: str, source_rg: str, target_rg_id: str, resource_ids: List[str], inventory_snapshot: Dict[str, Any] = None, snapshot_id: str = None) -> Dict[str, Any]:
         """
         Validates if resources can be moved to the target resource group.
-        Includes "Intelligent" Dependency Check if inventory_snapshot is provided.
+        Includes "Intelligent" Dependency Check if inventory_snapshot is provided;
+        pass the owning job's id as snapshot_id to reuse its dependency graph across calls.
         """
         # 1. Dependency Check (Intelligent Layer)
-        if inventory_snapshot:
+        if inventory_snapshot and inventory_snapshot.get("resources"):
             try:
-                resolver = DependencyResolver(inventory_snapshot)
-                missing = resolver.get_missing_dependencies(resource_ids)
+                resolver = DependencyResolver.for_snapshot(inventory_snapshot, snapshot_id)
+                missing = resolver.get_missing_dependencies(normalize_ids(resource_ids))
                 
                 if missing:
                     msg = f"Validation Warning: The following required dependencies are missing from the move batch: {', '.join(missing)}. The move may fail."
@@ -73,44 +96,61 @@ class MigrationService:
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type(HttpResponseError),
+        retry=retry_if_exception(_is_transient),
         reraise=True
     )
-    def execute_move(self, source_subscription_id: str, source_rg: str, target_rg_id: str, resource_ids: List[str]) -> Dict[str, Any]:
+    def start_move(self, source_subscription_id: str, source_rg: str, target_rg_id: str, resource_ids: List[str]) -> str:
         """
-        Executes the move operation. This is a Long Running Operation.
-        Retries on transient HTTP errors up to 3 times.
+        Kicks off the move Long Running Operation and returns its continuation token
+        without waiting for it. Only the kickoff is retried on transient HTTP errors;
+        progress is tracked separately through poll_move.
         """
         client = self.connector.get_resource_client(source_subscription_id)
-        
+
         move_info = ResourcesMoveInfo(
             resources=resource_ids,
             target_resource_group=target_rg_id
         )
 
         logger.info(f"Starting move for {len(resource_ids)} resources...")
-        
+        poller = client.resources.begin_move_resources(
+            source_resource_group_name=source_rg,
+            parameters=move_info,
+            polling=_SingleStatusCheck(0)
+        )
+        return poller.continuation_token()
+
+    def poll_move(self, source_subscription_id: str, source_rg: str, token: str) -> Dict[str, Any]:
+        """
+        Rehydrates the move operation from its continuation token and reports its state
+        without blocking. Returns {"done": False, "status": ...} while it is still running.
+        Transport and transient HTTP errors are raised rather than reported as a failed move.
+        """
+        client = self.connector.get_resource_client(source_subscription_id)
+        poller = client.resources.begin_move_resources(
+            source_resource_group_name=source_rg,
+            parameters=None,
+            continuation_token=token,
+            polling=_SingleStatusCheck(0)
+        )
+
         try:
-            poller = client.resources.begin_move_resources(
-                source_resource_group_name=source_rg,
-                parameters=move_info
-            )
-            
-            # For MVP, we wait synchronously. In PROD, we would return the poller token or run in a background worker that polls.
-            poller.result() 
-            
-            logger.info("Move operation completed successfully")
-            return {"success": True, "status": "COMPLETED"}
-            
+            poller.wait()
         except HttpResponseError as e:
-            # Check if it's a retryable error code (e.g. 429 Too Many Requests, 503 Service Unavailable)
-            # Default generic retry grabs all HttpResponseError, which might be aggressive, but okay for MVP reliability.
-            if e.status_code in [429, 503, 500]:
-                 logger.warning(f"Transient error encountered: {e.status_code}. Retrying...")
-                 raise e # Processed by tenacity
-            
+            # Throttling, server errors, auth hiccups and responses without a status
+            # say nothing about the move itself; the caller counts them and retries
+            if e.status_code is None or e.status_code in _RETRYABLE_STATUS or e.status_code in (401, 403):
+                raise
+            # The move's status URL answers with the operation's own error once it has failed
             logger.error(f"Move operation failed: {e.message}")
-            return {"success": False, "status": "FAILED", "error": e.message}
-        except Exception as e:
-            logger.error(f"Move operation failed unexpectedly: {str(e)}")
-            return {"success": False, "status": "FAILED", "error": str(e)}
+            return {"done": True, "success": False, "status": "FAILED", "error": e.message}
+        status = poller.status()
+
+        state = status.lower()
+        if state == "succeeded":
+            logger.info("Move operation completed successfully")
+            return {"done": True, "success": True, "status": "COMPLETED"}
+        if state in ("failed", "canceled", "cancelled"):
+            logger.error(f"Move operation ended with status {status}")
+            return {"done": True, "success": False, "status": "FAILED", "error": f"Move operation {status}"}
+        return {"done": False, "success": False, "status": status}
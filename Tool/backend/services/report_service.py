@@ -1,94 +1,210 @@
-import pandas as pd
 import io
+from copy import copy
 from datetime import datetime
-from typing import List, Dict, Any
-from openpyxl.styles import PatternFill, Border, Side, Alignment, Font
+from typing import List, Dict, Any, Sequence
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Border, Side, Alignment, Font, NamedStyle
+from openpyxl.styles.borders import DEFAULT_BORDER
 from openpyxl.utils import get_column_letter
-from .compatibility import CompatibilityService
+from .compatibility import CompatibilityService, DETAILED_REPORT_COLUMNS
+
+# Shared cell styles, built once; openpyxl registers each distinct style per workbook
+_THIN = Side(border_style="thin", color="000000")
+_BORDER_ALL = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+_FILL_DARK = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid") # Dark Blue
+_FILL_LIGHT = PatternFill(start_color="BDD7EE", end_color="BDD7EE", fill_type="solid") # Light Blue
+_FONT_TITLE = Font(name="Calibri", size=14, color="FFFFFF", bold=True)
+_FONT_HEADER = Font(name="Calibri", size=11, color="FFFFFF", bold=True)
+_FONT_BOLD = Font(name="Calibri", size=11, bold=True)
+_FONT_NORMAL = Font(name="Calibri", size=11, color="000000")
+_FONT_RED = Font(name="Calibri", size=11, color="FF0000")
+_FONT_BOLD_PLAIN = Font(bold=True)
+_FONT_RED_PLAIN = Font(color="FF0000")
+_FONT_LOGO = Font(name="Arial Black", size=16, color="EB5E76") # Try to match red/pink logo color
+_ALIGN_CENTER = Alignment(horizontal='center')
+_ALIGN_MIDDLE = Alignment(horizontal='center', vertical='center')
+_ALIGN_CENTER_WRAP = Alignment(horizontal='center', vertical='center', wrap_text=True)
+_ALIGN_RIGHT = Alignment(horizontal='right')
+
+def _named_styles() -> List[NamedStyle]:
+    """
+    Styles shared by the cover and Pre-Req layouts, so each styled cell takes one
+    assignment. Built per workbook: a NamedStyle binds to the workbook it's added to.
+    """
+    return [
+        NamedStyle(name="CoverTitle", font=_FONT_TITLE, fill=_FILL_DARK, border=DEFAULT_BORDER, alignment=_ALIGN_MIDDLE),
+        NamedStyle(name="HeaderDark", font=_FONT_HEADER, fill=_FILL_DARK, border=_BORDER_ALL),
+        NamedStyle(name="HeaderLight", font=_FONT_BOLD, fill=_FILL_LIGHT, border=_BORDER_ALL),
+        NamedStyle(name="BodyNormal", font=_FONT_NORMAL, border=_BORDER_ALL),
+        NamedStyle(name="BodyRed", font=_FONT_RED, border=_BORDER_ALL),
+    ]
+
+# Cover page table of contents: (Sr. No, Title, Page No.)
+_CONTENTS = (
+    ("01.", "Cover Page", "1"),
+    ("02.", "Pre-Requisites", "2"),
+    ("03.", "Resource Impact", "3"),
+    ("04.", "Azure Subscription 1", "4"),
+    ("05.", "Pre-Migration Tasks", "5"),
+    ("06.", "Post-Migration Tasks", "6"),
+    ("07.", "Public IP Info", "7"),
+    ("08.", "Rollback Plan", "8"),
+    ("09.", "Escalation Matrix", "9"),
+    ("10.", "Test Matrix", "10"),
+)
+
+# Pre-Req checklist (29 items matching the sample); None comments are filled from the inventory
+_PREREQ_CHECKS = (
+    ("Quota + Usage check on Destination subscription", "Available"),
+    ("Owner Access without Conditions", "Required at Destination Subscription"),
+    ("Owner Access without Conditions", "Required at Source Subscription"), # Added to match typical dual check or just keep dest
+    ("VMs Status", None),
+    ("Reservations", "Please note that Reservations will not be directly moved..."),
+    ("Whether Port 25 Open on Source Subscription", "Please note that Microsoft isn't allowing SMTP port 25..."),
+    ("Resource Count", None),
+    ("VPN SKU Change", "Not Applicable"),
+    ("Global Admin Access", "Not Applicable"),
+    ("System Assigned Managed Identity", None),
+    ("Whether using Cloud PC", "Not Applicable"),
+    ("Marketplace VM", "Not Applicable"),
+    ("Nerdio Automations", "Not Applicable"),
+    ("Vnet Peering/Global Peering", "Not Applicable"),
+    ("Managed Identity associated with DIs", "Not Applicable"),
+    ("Firewall (If any)", None),
+    ("Disk Encryption (ADE)", None),
+    ("SQLVM Backups", None),
+    ("Recovery Services Vault used for DR", "Not Applicable"),
+    ("Recovery Services Vault - Immutable", "Not Applicable"),
+    ("Recovery Services Vault - Locked", "Not Applicable"),
+    ("Site Recovery Infrastructure", "Not Applicable"),
+    ("Custom Domain in App Services", "Not Applicable"),
+    ("NICs pointing to other subscription", "Not Applicable"),
+    ("BGP Peering in Site-to-Site Connection", "Not Applicable"),
+    ("Microsoft Sentinel", "Not Applicable"),
+    ("Entra Domain Services / LDAP", "Not Applicable"),
+    ("Azure Databricks Service", "Not Applicable"),
+    ("Data Factory -> SHIR", "Not Applicable"),
+)
+
+def _track_widths(widths: list, row: Sequence) -> None:
+    """Folds one row into the running per-column max text length (empty cells count as 0)."""
+    for i, v in enumerate(row):
+        if v:
+            n = len(str(v))
+            if n > widths[i]:
+                widths[i] = n
+
+def _apply_widths(worksheet, widths: list) -> None:
+    for i, length in enumerate(widths, start=1):
+        worksheet.column_dimensions[get_column_letter(i)].width = min(length, 80) + 5
+
+def _has_disk_encryption(resource: Dict[str, Any], rtype: str) -> bool:
+    """
+    Whether a resource shows Azure Disk Encryption or a disk encryption set: the
+    resource type or name (ADE extension, encryption sets), or encryption settings
+    that are actually enabled on a managed disk or a VM's OS disk.
+    """
+    if "diskencryption" in rtype or "diskencryption" in resource.get("name", "").lower():
+        return True
+    props = resource.get("properties") or {}
+    if rtype.endswith("/disks"):
+        return bool((props.get("encryptionSettingsCollection") or {}).get("enabled")
+                    or (props.get("encryption") or {}).get("diskEncryptionSetId"))
+    if rtype.endswith("/virtualmachines"):
+        os_disk = (props.get("storageProfile") or {}).get("osDisk") or {}
+        return bool((os_disk.get("encryptionSettings") or {}).get("enabled")
+                    or (os_disk.get("managedDisk") or {}).get("diskEncryptionSet"))
+    return False
 
 class ReportService:
+    # Resource Impact sheet: substring of the lowercased type -> (impact level, remarks).
+    # Checked in order, so scale sets and VM extensions rate as VMs.
+    DEFAULT_IMPACT = ("Minimal", "No service interruption expected.")
+    IMPACT_RULES = {
+        "virtualmachines": ("High", "VM will be stopped and restarted. Temporary downtime required."),
+        "publicipaddresses": ("Critical", "Basic SKU Public IPs may change address during move. Standard SKU is static."),
+    }
+
     def __init__(self):
         self.compatibility_service = CompatibilityService()
-        
-        # Styles
-        self.header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid") # Dark Blue
-        self.header_font = Font(name="Calibri", size=14, color="FFFFFF", bold=True)
-        self.sub_header_fill = PatternFill(start_color="BDD7EE", end_color="BDD7EE", fill_type="solid") # Light Blue
-        self.border_thin = Side(border_style="thin", color="000000")
-        self.border_full = Border(left=self.border_thin, right=self.border_thin, top=self.border_thin, bottom=self.border_thin)
-
-    def generate_excel_report(self, job_id: str, inventory: Dict[str, Any], blockers: Dict[str, Any]) -> bytes:
+
+    def generate_excel_report(self, job_id: str, inventory: Dict[str, Any], blockers: Dict[str, Any]) -> io.BytesIO:
         """
         Generates a professional Excel report with Custom Cover and Pre-Req pages.
+        Returns the rewound buffer; callers that need bytes can call getvalue().
         """
         output = io.BytesIO()
         resources = inventory.get("resources", [])
+        # Lowercased once here; the Pre-Req, impact and Public IP sheets all classify by type
+        resource_types = [r.get("type", "").lower() for r in resources]
         
         # 1. Prepare Data
         report_data = self.compatibility_service.generate_detailed_report(resources, existing_blockers=blockers)
         
         # 2. Excel Generation
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Note: We must create sheets in order.
-            
-            # --- Sheet 1: Cover Page ---
-            self._create_cover_page(writer, job_id, inventory)
-            
-            # --- Sheet 2: Pre-Requisites ---
-            self._create_prereq_page(writer, inventory)
-            
-            # --- Sheet 3: Resource Impact ---
-            self._create_impact_sheet(writer, resources)
-
-            # --- Sheet 4: Azure Subscription 1 (Assessment Details) ---
-            df_details = pd.DataFrame(report_data)
-            df_details.to_excel(writer, index=False, sheet_name="Azure Subscription 1")
-            self._format_worksheet(writer.sheets['Azure Subscription 1'])
-
-            # --- Sheet 5: Pre-Migration Tasks ---
-            # Placeholder for now, can be expanded
-            df_pre = pd.DataFrame({"Task": ["Snapshot VMs", "Verify Backups"], "Status": ["Pending", "Pending"]})
-            df_pre.to_excel(writer, index=False, sheet_name="Pre-Migration Tasks")
-            self._format_worksheet(writer.sheets['Pre-Migration Tasks'])
-
-            # --- Sheet 6: Post-Migration Tasks ---
-            df_post = pd.DataFrame({"Task": ["Verify DNS", "Install Extensions"], "Status": ["Pending", "Pending"]})
-            df_post.to_excel(writer, index=False, sheet_name="Post-Migration Tasks")
-            self._format_worksheet(writer.sheets['Post-Migration Tasks'])
-
-            # --- Sheet 7: Public IP Info ---
-            # Filter PIPs
-            pips = [r for r in resources if "publicipaddresses" in r.get("type", "").lower()]
-            pips_data = [{
-                "Name": p.get("name"), 
-                "IP Address": p.get("properties", {}).get("ipAddress", "Dynamic"), 
-                "SKU": p.get("sku", {}).get("name", "Basic")
-            } for p in pips]
-            pd.DataFrame(pips_data).to_excel(writer, index=False, sheet_name="Public IP Info")
-            self._format_worksheet(writer.sheets['Public IP Info'])
-
-            # --- Sheet 8: Rollback Plan ---
-            self._create_rollback_sheet(writer)
-
-            # --- Sheet 9: Escalation Matrix ---
-            self._create_escalation_sheet(writer)
-
-            # --- Sheet 10: Test Matrix ---
-            self._create_test_sheet(writer)
+        # Write-only workbook: rows are streamed to the XML as they're appended instead of
+        # held as cell objects, which keeps memory flat on large inventories.
+        workbook = Workbook(write_only=True)
 
-        output.seek(0)
-        return output.getvalue()
+        # Cover and Pre-Req need merged cells and random-access writes, so they're laid
+        # out on a small scratch workbook and then streamed across row by row.
+        layout = Workbook()
+        for style in _named_styles():
+            layout.add_named_style(style)
 
-    def _create_cover_page(self, writer, job_id, inventory):
-        workbook = writer.book
-        sheet = workbook.create_sheet("Cover", 0)
+        # --- Sheet 1: Cover Page ---
+        self._copy_to_write_only(self._create_cover_page(layout, job_id, inventory), workbook)
+        
+        # --- Sheet 2: Pre-Requisites ---
+        self._copy_to_write_only(self._create_prereq_page(layout, inventory, resource_types), workbook)
         
-        # --- Styles ---
-        fill_blue_dark = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
-        fill_blue_light = PatternFill(start_color="BDD7EE", end_color="BDD7EE", fill_type="solid")
-        font_white_bold = Font(name="Calibri", size=14, color="FFFFFF", bold=True)
-        font_black_bold = Font(name="Calibri", size=11, bold=True)
-        border_all = Border(left=self.border_thin, right=self.border_thin, top=self.border_thin, bottom=self.border_thin)
+        # --- Sheet 3: Resource Impact ---
+        self._create_impact_sheet(workbook, resources, resource_types)
+
+        # --- Sheet 4: Azure Subscription 1 (Assessment Details) ---
+        self._write_table(workbook, "Azure Subscription 1", DETAILED_REPORT_COLUMNS, report_data)
+
+        # --- Sheet 5: Pre-Migration Tasks ---
+        # Placeholder for now, can be expanded
+        self._write_table(workbook, "Pre-Migration Tasks", ("Task", "Status"), [
+            ("Snapshot VMs", "Pending"),
+            ("Verify Backups", "Pending"),
+        ])
+
+        # --- Sheet 6: Post-Migration Tasks ---
+        self._write_table(workbook, "Post-Migration Tasks", ("Task", "Status"), [
+            ("Verify DNS", "Pending"),
+            ("Install Extensions", "Pending"),
+        ])
+
+        # --- Sheet 7: Public IP Info ---
+        # Filtered and shaped in one generator; _write_table buffers the rows only once
+        pips_data = (
+            (
+                r.get("name"), 
+                r.get("properties", {}).get("ipAddress", "Dynamic"), 
+                r.get("sku", {}).get("name", "Basic")
+            )
+            for r, rtype in zip(resources, resource_types) if "publicipaddresses" in rtype
+        )
+        self._write_table(workbook, "Public IP Info", ("Name", "IP Address", "SKU"), pips_data)
+
+        # --- Sheet 8: Rollback Plan ---
+        self._create_rollback_sheet(workbook)
+
+        # --- Sheet 9: Escalation Matrix ---
+        self._create_escalation_sheet(workbook)
+
+        # --- Sheet 10: Test Matrix ---
+        self._create_test_sheet(workbook)
+
+        workbook.save(output)
+        output.seek(0)
+        return output
+
+    def _create_cover_page(self, workbook, job_id, inventory):
+        sheet = workbook.create_sheet("Cover")
 
         # --- Layout ---
         
@@ -97,37 +213,31 @@ class ReportService:
         sheet.merge_cells("B2:D4")
         logo_cell = sheet["B2"]
         logo_cell.value = "Tech Plus Talent"
-        logo_cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        logo_cell.font = Font(name="Arial Black", size=16, color="EB5E76") # Try to match red/pink logo color
+        logo_cell.alignment = _ALIGN_CENTER_WRAP
+        logo_cell.font = _FONT_LOGO
         self._apply_borders(sheet, "B2:D4")
 
         # Header Info (E2:J4) - Right side block
         # Row 2: "Project - CSP Migration"
         sheet["E2"] = "Project - CSP Migration"
         sheet.merge_cells("E2:J2")
-        sheet["E2"].fill = fill_blue_dark
-        sheet["E2"].font = font_white_bold
-        sheet["E2"].alignment = Alignment(horizontal='center', vertical='center')
+        sheet["E2"].style = "CoverTitle"
 
         # Row 3: "Olux Tech"
         sheet["E3"] = "Olux Tech"
         sheet.merge_cells("E3:J3")
-        sheet["E3"].fill = fill_blue_dark
-        sheet["E3"].font = font_white_bold
-        sheet["E3"].alignment = Alignment(horizontal='center', vertical='center')
+        sheet["E3"].style = "CoverTitle"
         
         # Row 4: "Migration Assessment Report"
         sheet["E4"] = "Migration Assessment Report"
         sheet.merge_cells("E4:J4")
-        sheet["E4"].fill = fill_blue_dark
-        sheet["E4"].font = font_white_bold
-        sheet["E4"].alignment = Alignment(horizontal='center', vertical='center')
+        sheet["E4"].style = "CoverTitle"
         
         # Row 5: Date (B5:J5)
         sheet["B5"] = f"Date: {datetime.now().strftime('%d-%m-%Y')}"
         sheet.merge_cells("B5:J5")
-        sheet["B5"].font = font_black_bold
-        sheet["B5"].border = border_all
+        sheet["B5"].font = _FONT_BOLD
+        sheet["B5"].border = _BORDER_ALL
         self._apply_borders(sheet, "B5:J5")
 
         # Spacer Row 6 (Empty)
@@ -137,9 +247,9 @@ class ReportService:
         # Header "CONTENTS"
         sheet["B7"] = "CONTENTS"
         sheet.merge_cells("B7:J7")
-        sheet["B7"].alignment = Alignment(horizontal='center')
-        sheet["B7"].font = font_black_bold
-        sheet["B7"].fill = fill_blue_light
+        sheet["B7"].alignment = _ALIGN_CENTER
+        sheet["B7"].font = _FONT_BOLD
+        sheet["B7"].fill = _FILL_LIGHT
         self._apply_borders(sheet, "B7:J7")
 
         # Table Column Headers
@@ -149,28 +259,12 @@ class ReportService:
         sheet["J8"] = "Page No."
         
         for cell in ["B8", "C8", "J8"]:
-             c = sheet[cell]
-             c.font = font_black_bold
-             c.fill = fill_blue_light
-             c.border = border_all
+            sheet[cell].style = "HeaderLight"
         self._apply_borders(sheet, "C8:I8") # Apply to merged range
 
         # Rows
-        contents = [
-            ("01.", "Cover Page", "1"),
-            ("02.", "Pre-Requisites", "2"),
-            ("03.", "Resource Impact", "3"),
-            ("04.", "Azure Subscription 1", "4"),
-            ("05.", "Pre-Migration Tasks", "5"),
-            ("06.", "Post-Migration Tasks", "6"),
-            ("07.", "Public IP Info", "7"),
-            ("08.", "Rollback Plan", "8"),
-            ("09.", "Escalation Matrix", "9"),
-            ("10.", "Test Matrix", "10"),
-        ]
-        
         row_idx = 9
-        for sr, title, page in contents:
+        for sr, title, page in _CONTENTS:
             sheet[f"B{row_idx}"] = sr
             sheet[f"C{row_idx}"] = title
             sheet.merge_cells(f"C{row_idx}:I{row_idx}")
@@ -180,8 +274,8 @@ class ReportService:
             # Sample looks like all rows are light blue.
             for col in range(2, 11): # B to J
                 cell = sheet.cell(row=row_idx, column=col)
-                cell.fill = fill_blue_light
-                cell.border = self.border_full
+                cell.fill = _FILL_LIGHT
+                cell.border = _BORDER_ALL
             
             row_idx += 1
             
@@ -190,101 +284,62 @@ class ReportService:
         # "No of Sheets in this report : 10" (B:F)
         sheet[f"B{footer_row}"] = "No of Sheets in this report : 10"
         sheet.merge_cells(f"B{footer_row}:F{footer_row}")
-        sheet[f"B{footer_row}"].font = font_black_bold
-        sheet[f"B{footer_row}"].border = border_all
+        sheet[f"B{footer_row}"].font = _FONT_BOLD
+        sheet[f"B{footer_row}"].border = _BORDER_ALL
         
         # "Report Prepared By: TPT Migration Team" (G:J)
         sheet[f"G{footer_row}"] = "Report Prepared By: TPT Migration Team"
         sheet.merge_cells(f"G{footer_row}:J{footer_row}")
-        sheet[f"G{footer_row}"].font = font_black_bold
-        sheet[f"G{footer_row}"].alignment = Alignment(horizontal='right')
-        sheet[f"G{footer_row}"].border = border_all
+        sheet[f"G{footer_row}"].font = _FONT_BOLD
+        sheet[f"G{footer_row}"].alignment = _ALIGN_RIGHT
+        sheet[f"G{footer_row}"].border = _BORDER_ALL
         
         # Apply borders to the whole footer row range
         for c in range(2, 11):
-            sheet.cell(row=footer_row, column=c).border = self.border_full
+            sheet.cell(row=footer_row, column=c).border = _BORDER_ALL
 
-    def _apply_borders(self, sheet, range_string):
-        """Applies full borders to a merged or single range"""
-        rows = sheet[range_string]
-        # openpyxl range can be a tuple of rows
-        for row in rows:
-            for cell in row:
-                cell.border = self.border_full
+        return sheet
 
-    def _create_prereq_page(self, writer, inventory):
-        workbook = writer.book
+    def _create_prereq_page(self, workbook, inventory, resource_types):
         sheet = workbook.create_sheet("Pre-Req")
-        
-        # Styles
-        fill_header = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid") # Dark Blue
-        font_header = Font(name="Calibri", size=11, color="FFFFFF", bold=True)
-        font_normal = Font(name="Calibri", size=11, color="000000")
-        border_all = Border(left=self.border_thin, right=self.border_thin, top=self.border_thin, bottom=self.border_thin)
 
         # Header Row
         sheet["A1"] = "Checks"
         sheet["B1"] = "Comment"
         
         for cell in ["A1", "B1"]:
-            sheet[cell].fill = fill_header
-            sheet[cell].font = font_header
-            sheet[cell].border = border_all
+            sheet[cell].style = "HeaderDark"
         
-        # Aggregates
+        # Aggregates, classified in one pass over the resources
         resources = inventory.get("resources", [])
-        vms = [r for r in resources if "virtualmachines" in r.get("type", "").lower()]
-        
-        # Check List - Full 29 Items matching sample
-        # We can implement logic for some, others static "Not Applicable"
-        
-        # Logic helpers
-        has_firewall = any("firewall" in r.get("type", "").lower() for r in resources)
-        has_ade = any("diskencryption" in str(r).lower() for r in resources)
-        has_sql = any("sql" in r.get("type", "").lower() for r in resources)
-        
-        checks = [
-            ("Quota + Usage check on Destination subscription", "Available"),
-            ("Owner Access without Conditions", "Required at Destination Subscription"),
-            ("Owner Access without Conditions", "Required at Source Subscription"), # Added to match typical dual check or just keep dest
-            ("VMs Status", f"All {len(vms)} VMs Running (Healthy)" if vms else "No VMs Found"), 
-            ("Reservations", "Please note that Reservations will not be directly moved..."),
-            ("Whether Port 25 Open on Source Subscription", "Please note that Microsoft isn't allowing SMTP port 25..."),
-            ("Resource Count", str(len(resources))),
-            ("VPN SKU Change", "Not Applicable"),
-            ("Global Admin Access", "Not Applicable"),
-            ("System Assigned Managed Identity", "Virtual Machine" if any(vm.get("identity") for vm in vms) else "Not Applicable"),
-            ("Whether using Cloud PC", "Not Applicable"),
-            ("Marketplace VM", "Not Applicable"),
-            ("Nerdio Automations", "Not Applicable"),
-            ("Vnet Peering/Global Peering", "Not Applicable"),
-            ("Managed Identity associated with DIs", "Not Applicable"),
-            ("Firewall (If any)", "Present" if has_firewall else "Not Applicable"),
-            ("Disk Encryption (ADE)", "Enabled" if has_ade else "Not Applicable"),
-            ("SQLVM Backups", "Not Applicable" if not has_sql else "Check Required"),
-            ("Recovery Services Vault used for DR", "Not Applicable"),
-            ("Recovery Services Vault - Immutable", "Not Applicable"),
-            ("Recovery Services Vault - Locked", "Not Applicable"),
-            ("Site Recovery Infrastructure", "Not Applicable"),
-            ("Custom Domain in App Services", "Not Applicable"),
-            ("NICs pointing to other subscription", "Not Applicable"),
-            ("BGP Peering in Site-to-Site Connection", "Not Applicable"),
-            ("Microsoft Sentinel", "Not Applicable"),
-            ("Entra Domain Services / LDAP", "Not Applicable"),
-            ("Azure Databricks Service", "Not Applicable"),
-            ("Data Factory -> SHIR", "Not Applicable")
-        ]
+        vms = []
+        has_firewall = has_ade = has_sql = has_vm_identity = False
+        for r, rtype in zip(resources, resource_types):
+            if "virtualmachines" in rtype:
+                vms.append(r)
+                if r.get("identity"):
+                    has_vm_identity = True
+            if "firewall" in rtype:
+                has_firewall = True
+            if "sql" in rtype:
+                has_sql = True
+            if not has_ade and _has_disk_encryption(r, rtype):
+                has_ade = True
         
+        # Check List - Full 29 Items matching sample (_PREREQ_CHECKS)
+        # Only these depend on the inventory; the rest are static
+        dynamic = {
+            "VMs Status": f"All {len(vms)} VMs Running (Healthy)" if vms else "No VMs Found",
+            "Resource Count": str(len(resources)),
+            "System Assigned Managed Identity": "Virtual Machine" if has_vm_identity else "Not Applicable",
+            "Firewall (If any)": "Present" if has_firewall else "Not Applicable",
+            "Disk Encryption (ADE)": "Enabled" if has_ade else "Not Applicable",
+            "SQLVM Backups": "Not Applicable" if not has_sql else "Check Required",
+        }
+
         row_idx = 2
-        for check, comment in checks:
-            # Correct duplicates logic if needed, but list allows duplicates
-            if check == "Owner Access without Conditions" and row_idx == 3:
-                 # Sample showed row 3 as owner access too? No, row 3 is owner access. 
-                 # Let's stick to strict sample order.
-                 # Sample Row 2: Quota
-                 # Sample Row 3: Owner Access
-                 # Sample Row 4: VMs Status
-                 pass
+        for check, comment in _PREREQ_CHECKS:
+            comment = dynamic.get(check, comment)
 
             cell_a = sheet[f"A{row_idx}"]
             cell_b = sheet[f"B{row_idx}"]
@@ -292,13 +347,8 @@ class ReportService:
             cell_a.value = check
             cell_b.value = comment
             
-            cell_a.font = font_normal
-            cell_b.font = font_normal
-            cell_a.border = border_all
-            cell_b.border = border_all
-            
-            if "Required" in comment:
-                cell_b.font = Font(name="Calibri", size=11, color="FF0000") # Red
+            cell_a.style = "BodyNormal"
+            cell_b.style = "BodyRed" if "Required" in comment else "BodyNormal"
             
             row_idx += 1
             
@@ -322,12 +372,8 @@ class ReportService:
         sheet["D1"] = "Crucial Parameters"
         sheet["F1"] = "Status"
         sheet.merge_cells("D1:E1") # Merge for title width
-        sheet["D1"].fill = fill_header
-        sheet["D1"].font = font_header
-        sheet["F1"].fill = fill_header
-        sheet["F1"].font = font_header
-        sheet["D1"].border = border_all
-        sheet["F1"].border = border_all # And E1 border implicit
+        sheet["D1"].style = "HeaderDark"
+        sheet["F1"].style = "HeaderDark" # And E1 border implicit
         
         params = [
             ("Secure Score", "Good"),
@@ -342,8 +388,7 @@ class ReportService:
             sheet.merge_cells(f"D{p_row}:E{p_row}")
             
             for cell in [f"D{p_row}", f"E{p_row}", f"F{p_row}"]:
-                sheet[cell].border = border_all
-                sheet[cell].font = font_normal
+                sheet[cell].style = "BodyNormal"
             p_row += 1
             
         # Environment Info (Footer) - Needs to be separate section below checks
@@ -353,9 +398,9 @@ class ReportService:
         env_row_start = row_idx + 1 # Leave 1 empty row
         sheet[f"A{env_row_start}"] = "Basic Information of Azure Environment"
         sheet.merge_cells(f"A{env_row_start}:F{env_row_start}")
-        sheet[f"A{env_row_start}"].fill = PatternFill(start_color="BDD7EE", end_color="BDD7EE", fill_type="solid") # Light Blue
-        sheet[f"A{env_row_start}"].font = Font(name="Calibri", size=11, bold=True)
-        sheet[f"A{env_row_start}"].alignment = Alignment(horizontal='center')
+        sheet[f"A{env_row_start}"].fill = _FILL_LIGHT
+        sheet[f"A{env_row_start}"].font = _FONT_BOLD
+        sheet[f"A{env_row_start}"].alignment = _ALIGN_CENTER
         self._apply_borders(sheet, f"A{env_row_start}:F{env_row_start}")
         
         info_row = env_row_start + 1
@@ -382,7 +427,7 @@ class ReportService:
         val_row = info_row + 1
         sheet[f"A{val_row}"] = sub_id
         sheet[f"B{val_row}"] = "Not yet Provisioned"
-        sheet[f"B{val_row}"].font = Font(color="FF0000")
+        sheet[f"B{val_row}"].font = _FONT_RED_PLAIN
         sheet[f"D{val_row}"] = "CSP"
         sheet[f"E{val_row}"] = tenant_id
         
@@ -390,86 +435,104 @@ class ReportService:
         for r in range(info_row, val_row + 1):
              for c in range(1, 7): # A to F
                  cell = sheet.cell(row=r, column=c)
-                 cell.border = border_all
+                 cell.border = _BORDER_ALL
                  if r == info_row:
-                     cell.font = Font(bold=True)
+                     cell.font = _FONT_BOLD_PLAIN
 
         self._format_worksheet(sheet)
+        return sheet
 
-    def _create_impact_sheet(self, writer, resources):
+    def _create_impact_sheet(self, workbook, resources, resource_types):
+        rules = self.IMPACT_RULES
+        default = self.DEFAULT_IMPACT
         impact_rows = []
-        for res in resources:
-            rtype = res.get("type", "").lower()
-            name = res.get("name")
-            impact = "Minimal"
-            remarks = "No service interruption expected."
-            
-            if "virtualmachines" in rtype:
-                impact = "High"
-                remarks = "VM will be stopped and restarted. Temporary downtime required."
-            elif "publicipaddresses" in rtype:
-                sku = res.get("sku", {}).get("name", "").lower()
-                if "basic" in sku:
-                    impact = "Critical"
-                    remarks = "Basic SKU Public IPs may change address during move. Standard SKU is static."
+        for res, rtype in zip(resources, resource_types):
+            kind = next((k for k in rules if k in rtype), None)
+            impact, remarks = rules[kind] if kind else default
+
+            # Only Basic SKU addresses can change during a move
+            if kind == "publicipaddresses" and "basic" not in ((res.get("sku") or {}).get("name") or "").lower():
+                impact, remarks = default
             
-            impact_rows.append({
-                "Resource Name": name,
-                "Type": rtype,
-                "Impact Level": impact,
-                "Service Impact Description": remarks
-            })
-        pd.DataFrame(impact_rows).to_excel(writer, index=False, sheet_name="Resource Impact")
-        self._format_worksheet(writer.sheets['Resource Impact'])
-
-    def _create_rollback_sheet(self, writer):
-        df = pd.DataFrame({
-            "Step": [1, 2, 3],
-            "Action": ["Identify failed resources", "Delete partial resources in Target", "Restore DNS"],
-            "Responsible": ["Ops Team", "Ops Team", "NetAdmin"]
-        })
-        df.to_excel(writer, index=False, sheet_name="Rollback Plan")
-        self._format_worksheet(writer.sheets['Rollback Plan'])
-
-    def _create_escalation_sheet(self, writer):
-        df = pd.DataFrame({
-            "Role": ["Project Sponsor", "Project Manager", "Technical Lead"],
-            "Name": ["", "", ""],
-            "Contact": ["", "", ""]
-        })
-        df.to_excel(writer, index=False, sheet_name="Escalation Matrix")
-        self._format_worksheet(writer.sheets['Escalation Matrix'])
-
-    def _create_test_sheet(self, writer):
-        df = pd.DataFrame({
-            "Test Case": ["Verify VM Power On", "Verify App Access"],
-            "Status": ["Pending", "Pending"]
-        })
-        df.to_excel(writer, index=False, sheet_name="Test Matrix")
-        self._format_worksheet(writer.sheets['Test Matrix'])
+            impact_rows.append((res.get("name"), rtype, impact, remarks))
+        self._write_table(workbook, "Resource Impact", ("Resource Name", "Type", "Impact Level", "Service Impact Description"), impact_rows)
 
-    def _apply_borders(self, sheet, range_string):
-        rows = sheet[range_string]
+    def _create_rollback_sheet(self, workbook):
+        self._write_table(workbook, "Rollback Plan", ("Step", "Action", "Responsible"), [
+            (1, "Identify failed resources", "Ops Team"),
+            (2, "Delete partial resources in Target", "Ops Team"),
+            (3, "Restore DNS", "NetAdmin"),
+        ])
+
+    def _create_escalation_sheet(self, workbook):
+        self._write_table(workbook, "Escalation Matrix", ("Role", "Name", "Contact"), [
+            ("Project Sponsor", None, None),
+            ("Project Manager", None, None),
+            ("Technical Lead", None, None),
+        ])
+
+    def _create_test_sheet(self, workbook):
+        self._write_table(workbook, "Test Matrix", ("Test Case", "Status"), [
+            ("Verify VM Power On", "Pending"),
+            ("Verify App Access", "Pending"),
+        ])
+
+    def _write_table(self, workbook, title, headers, rows):
+        """
+        Streams a header row and value rows (tuples) into a new write-only sheet.
+        Column widths must be known before the first row is written, so they are
+        computed up front with the same rule as _format_worksheet.
+        """
+        sheet = workbook.create_sheet(title)
+        widths = [0] * len(headers)
+        _track_widths(widths, headers)
+        buffered = []
         for row in rows:
+            _track_widths(widths, row)
+            buffered.append(row)
+        _apply_widths(sheet, widths)
+
+        sheet.append(headers)
+        for row in buffered:
+            sheet.append(row)
+
+    def _copy_to_write_only(self, source, workbook):
+        """
+        Streams a fully laid-out sheet (values, styles, merges, widths) into a new
+        write-only sheet of the same title.
+        """
+        sheet = workbook.create_sheet(source.title)
+        for key, dim in source.column_dimensions.items():
+            if dim.width:
+                sheet.column_dimensions[key].width = dim.width
+
+        for row in source.iter_rows(min_row=1, min_col=1):
+            out = []
+            for c in row:
+                if not c.has_style:
+                    out.append(c.value)
+                    continue
+                cell = WriteOnlyCell(sheet, value=c.value)
+                cell.font = copy(c.font)
+                cell.fill = copy(c.fill)
+                cell.border = copy(c.border)
+                cell.alignment = copy(c.alignment)
+                out.append(cell)
+            sheet.append(out)
+
+        for merged in source.merged_cells.ranges:
+            sheet.merged_cells.add(merged.coord)
+
+    def _apply_borders(self, sheet, range_string):
+        """Applies full borders to a merged or single range"""
+        # openpyxl range can be a tuple of rows
+        for row in sheet[range_string]:
             for cell in row:
-                cell.border = self.border_full
+                cell.border = _BORDER_ALL
 
     def _format_worksheet(self, worksheet):
-        try:
-            for column_cells in worksheet.columns:
-                # Calculate max length
-                length = 0
-                for cell in column_cells:
-                    if cell.value:
-                        length = max(length, len(str(cell.value)))
-                
-                # Apply width
-                # Use openpyxl.utils.get_column_letter just to be safe
-                # And access column index from the first cell (even if merged, it has column index)
-                col_idx = column_cells[0].column
-                col_letter = get_column_letter(col_idx)
-                
-                length = min(length, 80)
-                worksheet.column_dimensions[col_letter].width = length + 5
-        except Exception as e:
-            print(f"Warning: Auto-format failed for sheet {worksheet.title}: {e}")
+        """Sizes every column to its longest value (capped at 80 chars) in one pass over the rows."""
+        widths = [0] * worksheet.max_column
+        for row in worksheet.iter_rows(values_only=True):
+            _track_widths(widths, row)
+        _apply_widths(worksheet, widths)
@@ -0,0 +1,99 @@
+import concurrent.futures
+import os
+import pathlib
+import sys
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Make the backend package importable from every test module, once
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+# Keep AI assessments in memory instead of writing data/ai_cache.sqlite into the tree
+os.environ.setdefault("AI_CACHE_PATH", ":memory:")
+# App startup still creates tables on the configured engine; point it away from dev.db
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+class InlineExecutor:
+    """Runs submitted jobs synchronously so tests can assert on their results."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+@pytest.fixture
+def inline_background(monkeypatch):
+    """Replaces the background job pool so jobs finish before the request returns."""
+    monkeypatch.setattr("main._bg_pool", InlineExecutor())
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    """Drops cached connectors so each test sees its own patched AzureConnector."""
+    import main
+    main._connector.cache_clear()
+    yield
+    main._connector.cache_clear()
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient for the whole run, so app startup happens once rather than per module."""
+    from fastapi.testclient import TestClient
+    from main import app
+    # Build the OpenAPI schema up front instead of on the first request
+    app.openapi()
+    with TestClient(app) as c:
+        yield c
+
+@pytest.fixture(scope="session")
+def test_engine():
+    """One in-memory SQLite database for the whole run; StaticPool shares its single connection across threads."""
+    from database import Base
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="session")
+def test_sessionmaker(test_engine):
+    """Session factory bound to the shared in-memory engine."""
+    return sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+
+@pytest.fixture(scope="session", autouse=True)
+def _override_db(test_sessionmaker):
+    """
+    Points request handlers and background jobs at the in-memory database for the
+    whole run, and restores whatever overrides the app had afterwards.
+    """
+    import main
+
+    def override_get_db():
+        db = test_sessionmaker()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    saved = dict(main.app.dependency_overrides)
+    main.app.dependency_overrides[main.get_db] = override_get_db
+    # Background jobs open sessions through main.get_db directly, not via Depends
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("main.get_db", override_get_db)
+        yield
+    main.app.dependency_overrides = saved
+
+@pytest.fixture
+def test_db(test_engine, test_sessionmaker):
+    """Session factory for the in-memory database; every table is emptied afterwards so no rows leak between tests."""
+    from database import Base
+
+    yield test_sessionmaker
+
+    # The app commits from several sessions on one connection, so an outer
+    # transaction rollback can't undo its writes; deleting is just as cheap in memory
+    with test_engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
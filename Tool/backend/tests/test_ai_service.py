@@ -0,0 +1,19 @@
+import pytest
+
+from services.ai_service import AIService
+
+@pytest.fixture(scope="module")
+def ai_service():
+    return AIService()
+
+def test_matrix_unsupported_type_gives_reason(ai_service):
+    result = ai_service.assess_migration_readiness("Microsoft.AAD/domainServices")
+    assert result == {
+        "supported": False,
+        "reason": "Microsoft.AAD/domainServices does not support move across subscriptions (Azure move-support matrix)",
+    }
+
+def test_matrix_supported_type(ai_service):
+    result = ai_service.assess_migration_readiness("Microsoft.Web/sites")
+    assert result["supported"] is True
+    assert result["reason"] == "Microsoft.Web/sites supports move across subscriptions (Azure move-support matrix)"
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from services import assessment_cache
+from services.assessment_cache import AssessmentCache
+
+RESULT = {"status": "Supported", "remarks": "Moves cleanly."}
+
+@pytest.fixture
+def matrix(tmp_path, monkeypatch):
+    """A stand-in move-support CSV whose mtime the tests control."""
+    csv = tmp_path / "move-support-resources.csv"
+    csv.write_text("Resource,Move Resource Group\n")
+    os.utime(csv, (1_000_000, 1_000_000))
+    monkeypatch.setattr(assessment_cache, "MOVE_SUPPORT_CSV", str(csv))
+    return csv
+
+def test_hit_survives_reopen(tmp_path, matrix):
+    path = str(tmp_path / "cache.sqlite")
+    AssessmentCache(path).set("openai", "gpt-4o", "microsoft.web/sites", RESULT)
+    assert AssessmentCache(path).get("openai", "gpt-4o", "microsoft.web/sites") == RESULT
+
+def test_miss_on_other_type_or_model(tmp_path, matrix):
+    cache = AssessmentCache(str(tmp_path / "cache.sqlite"))
+    cache.set("openai", "gpt-4o", "microsoft.web/sites", RESULT)
+    assert cache.get("openai", "gpt-4o", "microsoft.web/serverfarms") is None
+    assert cache.get("openai", "gpt-4o-mini", "microsoft.web/sites") is None
+
+def test_matrix_refresh_invalidates(tmp_path, matrix):
+    path = str(tmp_path / "cache.sqlite")
+    AssessmentCache(path).set("openai", "gpt-4o", "microsoft.web/sites", RESULT)
+    os.utime(matrix, (2_000_000, 2_000_000))
+    assert AssessmentCache(path).get("openai", "gpt-4o", "microsoft.web/sites") is None
+
+def test_falls_back_to_memory_when_db_unavailable(tmp_path, matrix):
+    # A directory can't be opened as a database
+    cache = AssessmentCache(str(tmp_path))
+    assert cache._conn is None
+    cache.set("openai", "gpt-4o", "microsoft.web/sites", RESULT)
+    assert cache.get("openai", "gpt-4o", "microsoft.web/sites") == RESULT
@@ -0,0 +1,51 @@
+import base64
+import json
+
+import pytest
+
+import auth
+
+def make_token(kid):
+    header = base64.urlsafe_b64encode(json.dumps({"alg": "RS256", "kid": kid}).encode()).decode().rstrip("=")
+    return f"{header}.e30.sig"
+
+@pytest.fixture
+def jwks(monkeypatch):
+    """Empties the key and claims caches and routes JWKS fetches through a stub."""
+    monkeypatch.setenv("AZURE_TENANT_ID", "tenant1")
+    monkeypatch.setattr(auth, "_jwks_cache", {})
+    monkeypatch.setattr(auth, "_token_cache", {})
+    monkeypatch.setattr(auth, "_jwks_last_fetch", 0.0)
+    calls = []
+
+    def fetch(result):
+        def _fetch():
+            calls.append(1)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        monkeypatch.setattr(auth, "_fetch_jwks", _fetch)
+
+    fetch.calls = calls
+    return fetch
+
+def test_failed_refresh_does_not_start_interval(jwks):
+    jwks(ConnectionError("offline"))
+    assert auth.get_signing_key("k1") is None
+    assert auth._jwks_last_fetch == 0.0
+
+    # The next lookup retries instead of waiting out the interval
+    jwks({"k1": {"kid": "k1"}})
+    assert auth.get_signing_key("k1") == {"kid": "k1"}
+    assert len(jwks.calls) == 2
+
+def test_successful_refresh_is_throttled(jwks):
+    jwks({"k1": {"kid": "k1"}})
+    assert auth.get_signing_key("k2") is None
+    assert auth.get_signing_key("k2") is None
+    assert len(jwks.calls) == 1
+
+def test_unknown_kid_is_not_rejected(jwks):
+    jwks(ConnectionError("offline"))
+    claims = auth.validate_token(make_token("unknown"))
+    assert claims["sub"] == "mock_user_id"
@@ -0,0 +1,41 @@
+import pytest
+
+from services import dependency_resolver
+from services.dependency_resolver import DependencyResolver, normalize_ids
+
+VM = "/subscriptions/sub1/resourceGroups/rg1/providers/Microsoft.Compute/virtualMachines/vm1"
+NIC = "/subscriptions/sub1/resourceGroups/rg1/providers/Microsoft.Network/networkInterfaces/nic1"
+
+SNAPSHOT = {
+    "resources": [{"id": VM}, {"id": NIC}],
+    "dependencies": [{"source": VM, "target": NIC}],
+}
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(dependency_resolver, "_resolver_cache", dependency_resolver.OrderedDict())
+    monkeypatch.setattr(dependency_resolver, "RESOLVER_CACHE_MAX_SIZE", 2)
+
+def test_missing_dependencies():
+    resolver = DependencyResolver.for_snapshot(SNAPSHOT)
+    assert resolver.get_missing_dependencies(normalize_ids([VM])) == [NIC.lower()]
+    assert resolver.get_missing_dependencies(normalize_ids([VM, NIC])) == []
+
+def test_reused_per_snapshot_id():
+    first = DependencyResolver.for_snapshot(SNAPSHOT, "job1")
+    assert DependencyResolver.for_snapshot(SNAPSHOT, "job1") is first
+    assert DependencyResolver.for_snapshot(SNAPSHOT, "job2") is not first
+
+def test_not_cached_without_id():
+    assert DependencyResolver.for_snapshot(SNAPSHOT) is not DependencyResolver.for_snapshot(SNAPSHOT)
+    assert not dependency_resolver._resolver_cache
+
+def test_evicts_least_recently_used():
+    job1 = DependencyResolver.for_snapshot(SNAPSHOT, "job1")
+    DependencyResolver.for_snapshot(SNAPSHOT, "job2")
+    # Touching job1 makes job2 the eviction candidate
+    DependencyResolver.for_snapshot(SNAPSHOT, "job1")
+    DependencyResolver.for_snapshot(SNAPSHOT, "job3")
+
+    assert list(dependency_resolver._resolver_cache) == ["job1", "job3"]
+    assert DependencyResolver.for_snapshot(SNAPSHOT, "job1") is job1
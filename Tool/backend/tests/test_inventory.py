@@ -1,52 +1,49 @@
+import itertools
+import threading
+import time
+
 import pytest
-import sys
-import os
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
-# Add backend to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
+from services import inventory
 from services.inventory import InventoryService
 
-def test_dependency_graph_building():
+def make_res(id, name, type, properties=None, location="eastus"):
+    """A plain stand-in for an SDK GenericResource; only the connector and client need MagicMock."""
+    payload = {"properties": properties or {}}
+    return SimpleNamespace(
+        id=id, name=name, type=type, location=location, kind=None, tags={}, sku=None,
+        as_dict=lambda: payload,
+    )
+
+def vm_nic_pairs(count):
+    # VMi depends on NICi
+    for i in range(1, count + 1):
+        vm_id = f"/subscriptions/sub1/resourceGroups/rg1/providers/Microsoft.Compute/virtualMachines/vm{i}"
+        nic_id = f"/subscriptions/sub1/resourceGroups/rg1/providers/Microsoft.Network/networkInterfaces/nic{i}"
+        yield make_res(
+            vm_id, f"vm{i}", "Microsoft.Compute/virtualMachines",
+            # Mock properties where dependency exists
+            properties={
+                "networkProfile": {
+                    "networkInterfaces": [
+                        {"id": nic_id}
+                    ]
+                }
+            }
+        )
+        yield make_res(nic_id, f"nic{i}", "Microsoft.Network/networkInterfaces")
+
+@pytest.mark.parametrize("n", [2, 100, 10_000])
+def test_dependency_graph_building(n):
     # Setup Mocks
     mock_connector = MagicMock()
     mock_client = MagicMock()
     mock_connector.get_resource_client.return_value = mock_client
     
-    # Mock Resources
-    # VM1 depends on NIC1
-    vm_id = "/subscriptions/sub1/resourceGroups/rg1/providers/Microsoft.Compute/virtualMachines/vm1"
-    nic_id = "/subscriptions/sub1/resourceGroups/rg1/providers/Microsoft.Network/networkInterfaces/nic1"
-    
-    vm_res = MagicMock()
-    vm_res.id = vm_id
-    vm_res.name = "vm1"
-    vm_res.type = "Microsoft.Compute/virtualMachines"
-    vm_res.location = "eastus"
-    vm_res.tags = {}
-    vm_res.sku = None
-    # Mock properties where dependency exists
-    vm_res.as_dict.return_value = {
-        "properties": {
-            "networkProfile": {
-                "networkInterfaces": [
-                    {"id": nic_id}
-                ]
-            }
-        }
-    }
-    
-    nic_res = MagicMock()
-    nic_res.id = nic_id
-    nic_res.name = "nic1"
-    nic_res.type = "Microsoft.Network/networkInterfaces"
-    nic_res.location = "eastus"
-    nic_res.tags = {}
-    nic_res.sku = None
-    nic_res.as_dict.return_value = {"properties": {}}
-
-    mock_client.resources.list.return_value = [vm_res, nic_res]
+    # Mock Resources: n // 2 VM/NIC pairs, yielded lazily like an SDK pager
+    mock_client.resources.list.return_value = vm_nic_pairs(n // 2)
     mock_client.resource_groups.list.return_value = []
 
     # Run Service
@@ -54,15 +51,50 @@ def test_dependency_graph_building():
     result = service.scan_subscription("sub1")
 
     # Assertions
-    assert result["total_resources"] == 2
+    assert result["total_resources"] == n
     dependencies = result["dependencies"]
-    assert len(dependencies) >= 1
+    # Index the edges once; every lookup below is O(1)
+    by_pair = {(e["source"], e["target"]): e for e in dependencies}
+    assert len(by_pair) == len(dependencies) == n // 2
     
     # Verify exact edge
-    edge = next((e for e in dependencies if e["source"] == vm_id and e["target"] == nic_id), None)
+    vm_id = "/subscriptions/sub1/resourceGroups/rg1/providers/Microsoft.Compute/virtualMachines/vm1"
+    nic_id = "/subscriptions/sub1/resourceGroups/rg1/providers/Microsoft.Network/networkInterfaces/nic1"
+    edge = by_pair.get((vm_id, nic_id))
     assert edge is not None
     assert edge["relation"] == "property_ref" or edge.get("type") == "property_link" # Allow either key based on implementation
 
-if __name__ == "__main__":
-    test_dependency_graph_building()
-    print("Test Passed!")
+def endless_vms():
+    # A pager that never runs out, so the producer is still busy when the scan fails
+    for i in itertools.count(1):
+        yield make_res(f"/subscriptions/sub1/resourceGroups/rg1/providers/Microsoft.Compute/virtualMachines/vm{i}", f"vm{i}", "Microsoft.Compute/virtualMachines")
+
+def broken_res():
+    res = make_res("/subscriptions/sub1/resourceGroups/rg1/providers/Microsoft.Compute/virtualMachines/bad", "bad", "Microsoft.Compute/virtualMachines")
+    res.as_dict = MagicMock(side_effect=ValueError("bad record"))
+    return res
+
+def prefetch_threads():
+    return [t for t in threading.enumerate() if t.name == "inventory-prefetch"]
+
+@pytest.mark.parametrize("failure", ["resource_groups", "conversion"])
+def test_prefetch_stops_when_scan_fails(failure, monkeypatch):
+    monkeypatch.setattr(inventory, "PREFETCH_STOP_POLL", 0.01)
+    mock_connector = MagicMock()
+    mock_client = MagicMock()
+    mock_connector.get_resource_client.return_value = mock_client
+
+    if failure == "resource_groups":
+        mock_client.resources.list.return_value = endless_vms()
+        mock_client.resource_groups.list.side_effect = RuntimeError("rg listing failed")
+    else:
+        mock_client.resources.list.return_value = itertools.chain([broken_res()], endless_vms())
+        mock_client.resource_groups.list.return_value = []
+
+    with pytest.raises((RuntimeError, ValueError)):
+        InventoryService(mock_connector).scan_subscription("sub1")
+
+    deadline = time.monotonic() + 5
+    while prefetch_threads() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not prefetch_threads()
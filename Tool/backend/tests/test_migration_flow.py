@@ -1,53 +1,40 @@
+import time
+import uuid
 import pytest
-from fastapi.testclient import TestClient
-from unittest.mock import MagicMock, patch
-import sys
-import os
-
-# Add backend to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from main import app, get_db
-from database import Base, engine, SessionLocal
-from models import AssessmentJob
-
-# Re-create DB
-Base.metadata.create_all(bind=engine)
-# client = TestClient(app) defined later after mocking if needed, but TestClient usually works fine with patches
-
-def override_get_db():
-    try:
-        db = SessionLocal()
-        yield db
-    finally:
-        db.close()
-
-app.dependency_overrides[get_db] = override_get_db
-client = TestClient(app)
-
-@patch("main.AzureConnector")
-@patch("main.MigrationService")
-def test_migration_flow(mock_migration_service_cls, mock_connector_cls):
-    # Setup
-    mock_migration = MagicMock()
-    mock_migration_service_cls.return_value = mock_migration
-    
+from unittest.mock import MagicMock
+from azure.core.exceptions import HttpResponseError
+
+import main
+from models import AssessmentJob, MigrationPlan
+
+@pytest.fixture
+def patched_services(monkeypatch):
+    """Swaps the Azure connector and migration service in main for mocks; returns the service mock."""
+    monkeypatch.setattr("main.AzureConnector", MagicMock(return_value=MagicMock()))
+
+    svc = MagicMock()
     # Mock Validation Success
-    mock_migration.validate_move.return_value = {"valid": True, "error": None}
-    
-    # Mock Execution Success
-    mock_migration.execute_move.return_value = {"success": True, "status": "COMPLETED"}
+    svc.validate_move.return_value = {"valid": True, "error": None}
+    # Mock Execution Success: the move is kicked off and found finished on its first check
+    svc.start_move.return_value = "continuation-token"
+    svc.poll_move.return_value = {"done": True, "success": True, "status": "COMPLETED"}
+    monkeypatch.setattr("main.MigrationService", MagicMock(return_value=svc))
+    return svc
+
+def test_migration_flow(client, patched_services, inline_background, test_db):
+    mock_migration = patched_services
 
-    # 1. Pre-seed a Job (Migration needs a job_id)
-    db = SessionLocal()
-    job = AssessmentJob(id="job_mig_test", tenant_id="tenant_1", status="COMPLETED")
+    # 1. Pre-seed a Job (Migration needs a job_id); unique so parallel runs never collide
+    job_id = f"job_mig_{uuid.uuid4().hex}"
+    db = test_db()
+    job = AssessmentJob(id=job_id, tenant_id="tenant_1", status="COMPLETED")
     db.add(job)
     db.commit()
     db.close()
 
     # 2. Trigger Migration
     payload = {
-        "job_id": "job_mig_test",
+        "job_id": job_id,
         "source_resource_group": "rg-source",
         "target_resource_group_id": "/subscriptions/sub2/resourceGroups/rg-target",
         "resources": [
@@ -56,24 +43,135 @@ def test_migration_flow(mock_migration_service_cls, mock_connector_cls):
     }
     
     response = client.post("/api/v1/migrate", json=payload)
-    assert response.status_code == 200
+    assert response.status_code == 202
     data = response.json()
     assert data["status"] == "ACCEPTED"
     plan_id = data["plan_id"]
+    assert response.headers["location"] == f"/api/v1/plans/{plan_id}"
+
+    # 3. Check Plan Status straight from the DB (inline_background runs the job within the request)
+    db = test_db()
+    plan = db.get(MigrationPlan, plan_id)
+    assert plan.job_id == job_id
+    assert plan.status == "COMPLETED"
+    assert plan.execution_log["status"] == "success"
+    db.close()
+    
+    # Verify calls
+    mock_migration.validate_move.assert_called_once()
+    mock_migration.start_move.assert_called_once()
+    mock_migration.poll_move.assert_called_once_with("sub1", "rg-source", "continuation-token")
+
+def test_plan_status_endpoint(client, test_db):
+    # Smoke test for the plan status serialization the UI polls
+    db = test_db()
+    job = AssessmentJob(id=f"job_plan_{uuid.uuid4().hex}", tenant_id="tenant_1", status="COMPLETED")
+    plan = MigrationPlan(job=job, status="COMPLETED", execution_log={"status": "success"})
+    db.add(plan)
+    db.commit()
+    plan_id = plan.id
+    db.close()
 
-    # 3. Check Plan Status (Mock background task execution)
-    # Since TestClient runs synchronous background tasks after request:
     response = client.get(f"/api/v1/plans/{plan_id}")
     assert response.status_code == 200
     plan_data = response.json()
-    
+    assert plan_data["id"] == plan_id
     assert plan_data["status"] == "COMPLETED"
     assert plan_data["execution_log"]["status"] == "success"
-    
-    # Verify calls
-    mock_migration.validate_move.assert_called_once()
-    mock_migration.execute_move.assert_called_once()
 
-if __name__ == "__main__":
-    test_migration_flow()
-    print("Test Passed!")
+    assert client.get("/api/v1/plans/missing").status_code == 404
+
+def seed_moving_plan(test_db, **log):
+    db = test_db()
+    job = AssessmentJob(id=f"job_move_{uuid.uuid4().hex}", tenant_id="tenant_1", status="COMPLETED")
+    plan = MigrationPlan(job=job, status="MOVING", execution_log={
+        "continuation_token": "continuation-token",
+        "subscription_id": "sub1",
+        "source_resource_group": "rg-source",
+        "started_at": time.time(),
+        "poll_failures": 0,
+        **log,
+    })
+    db.add(plan)
+    db.commit()
+    plan_id = plan.id
+    db.close()
+    return plan_id
+
+def load_plan(test_db, plan_id):
+    db = test_db()
+    plan = db.get(MigrationPlan, plan_id)
+    db.close()
+    return plan
+
+def test_running_move_stays_moving(patched_services, test_db):
+    patched_services.poll_move.return_value = {"done": False, "success": False, "status": "InProgress"}
+    plan_id = seed_moving_plan(test_db)
+
+    main.poll_migration_task(plan_id)
+
+    assert load_plan(test_db, plan_id).status == "MOVING"
+
+def test_move_past_deadline_fails(patched_services, test_db):
+    patched_services.poll_move.return_value = {"done": False, "success": False, "status": "InProgress"}
+    plan_id = seed_moving_plan(test_db, started_at=time.time() - main.MOVE_TIMEOUT - 1)
+
+    main.poll_migration_task(plan_id)
+
+    plan = load_plan(test_db, plan_id)
+    assert plan.status == "FAILED"
+    assert "did not finish" in plan.execution_log["error"]
+
+def test_repeated_poll_errors_fail_move(patched_services, test_db, monkeypatch):
+    monkeypatch.setattr("main.MOVE_MAX_POLL_FAILURES", 2)
+    patched_services.poll_move.side_effect = RuntimeError("ARM unreachable")
+    plan_id = seed_moving_plan(test_db)
+
+    main.poll_migration_task(plan_id)
+    plan = load_plan(test_db, plan_id)
+    assert plan.status == "MOVING"
+    assert plan.execution_log["poll_failures"] == 1
+
+    main.poll_migration_task(plan_id)
+    plan = load_plan(test_db, plan_id)
+    assert plan.status == "FAILED"
+    assert "ARM unreachable" in plan.execution_log["error"]
+
+def test_unavailable_status_check_keeps_move(test_db, monkeypatch):
+    # Real MigrationService over a connector whose status check answers 503
+    error = HttpResponseError(message="Service Unavailable")
+    error.status_code = 503
+    poller = MagicMock()
+    poller.wait.side_effect = error
+    connector = MagicMock()
+    connector.get_resource_client.return_value.resources.begin_move_resources.return_value = poller
+    monkeypatch.setattr("main.AzureConnector", MagicMock(return_value=connector))
+    plan_id = seed_moving_plan(test_db)
+
+    main.poll_migration_task(plan_id)
+
+    plan = load_plan(test_db, plan_id)
+    assert plan.status == "MOVING"
+    assert plan.execution_log["poll_failures"] == 1
+    assert plan.execution_log["continuation_token"] == "continuation-token"
+
+def test_first_check_error_keeps_move(client, patched_services, inline_background, test_db):
+    patched_services.poll_move.side_effect = RuntimeError("ARM unreachable")
+    db = test_db()
+    job = AssessmentJob(id=f"job_mig_{uuid.uuid4().hex}", tenant_id="tenant_1", status="COMPLETED")
+    db.add(job)
+    db.commit()
+    job_id = job.id
+    db.close()
+
+    response = client.post("/api/v1/migrate", json={
+        "job_id": job_id,
+        "source_resource_group": "rg-source",
+        "target_resource_group_id": "/subscriptions/sub2/resourceGroups/rg-target",
+        "resources": ["/subscriptions/sub1/resourceGroups/rg-source/providers/Microsoft.Compute/virtualMachines/vm1"],
+    })
+
+    plan = load_plan(test_db, response.json()["plan_id"])
+    assert plan.status == "MOVING"
+    assert plan.execution_log["continuation_token"] == "continuation-token"
+    assert plan.execution_log["poll_failures"] == 1
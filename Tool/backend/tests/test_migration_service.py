@@ -0,0 +1,99 @@
+import pytest
+from unittest.mock import MagicMock
+from azure.core.exceptions import HttpResponseError, ServiceRequestError
+from azure.core.polling.base_polling import BadStatus
+
+from services.migration import MigrationService, _SingleStatusCheck
+
+@pytest.fixture
+def service():
+    connector = MagicMock()
+    return MigrationService(connector), connector.get_resource_client.return_value
+
+def http_error(status_code, message="status check failed"):
+    error = HttpResponseError(message=message)
+    error.status_code = status_code
+    return error
+
+def make_poller(status=None, error=None):
+    poller = MagicMock()
+    if error:
+        poller.wait.side_effect = error
+    poller.status.return_value = status
+    return poller
+
+def test_poll_move_rehydrates_from_token(service):
+    svc, client = service
+    client.resources.begin_move_resources.return_value = make_poller("InProgress")
+
+    result = svc.poll_move("sub1", "rg-source", "continuation-token")
+
+    assert result == {"done": False, "success": False, "status": "InProgress"}
+    kwargs = client.resources.begin_move_resources.call_args.kwargs
+    assert kwargs["continuation_token"] == "continuation-token"
+    assert kwargs["source_resource_group_name"] == "rg-source"
+    assert isinstance(kwargs["polling"], _SingleStatusCheck)
+
+def test_poll_move_succeeded(service):
+    svc, client = service
+    client.resources.begin_move_resources.return_value = make_poller("Succeeded")
+
+    result = svc.poll_move("sub1", "rg-source", "continuation-token")
+
+    assert result == {"done": True, "success": True, "status": "COMPLETED"}
+
+@pytest.mark.parametrize("poller", [
+    make_poller("Failed"),
+    make_poller("Canceled"),
+    make_poller(error=http_error(409, "ResourceMoveFailed")),
+])
+def test_poll_move_failed(service, poller):
+    svc, client = service
+    client.resources.begin_move_resources.return_value = poller
+
+    result = svc.poll_move("sub1", "rg-source", "continuation-token")
+
+    assert result["done"] is True
+    assert result["success"] is False
+    assert result["status"] == "FAILED"
+
+@pytest.mark.parametrize("error", [
+    http_error(503),
+    http_error(429),
+    http_error(401),
+    http_error(None),
+    ServiceRequestError("Name or service not known"),
+])
+def test_poll_move_raises_when_status_check_is_inconclusive(service, error):
+    svc, client = service
+    client.resources.begin_move_resources.return_value = make_poller(error=error)
+
+    with pytest.raises(type(error)):
+        svc.poll_move("sub1", "rg-source", "continuation-token")
+
+def running_check():
+    """A polling method in the state a rehydrated, still-running poller is in."""
+    polling = _SingleStatusCheck(0)
+    polling._operation = MagicMock()
+    polling._status = "InProgress"
+    return polling
+
+def test_single_status_check_maps_bad_status_to_failure():
+    polling = running_check()
+    polling._pipeline_response = MagicMock()
+    polling.update_status = MagicMock(side_effect=BadStatus("Operation failed or canceled"))
+
+    with pytest.raises(HttpResponseError):
+        polling.run()
+
+    assert polling.status() == "Failed"
+    polling.update_status.assert_called_once()
+
+def test_single_status_check_does_one_request():
+    polling = running_check()
+    polling.update_status = MagicMock()
+
+    polling.run()
+
+    # Still running, but run() returns instead of sleeping and polling again
+    polling.update_status.assert_called_once()
@@ -0,0 +1,45 @@
+import io
+
+import pytest
+from openpyxl import load_workbook
+
+from services.report_service import ReportService
+
+def make_res(name, type, sku=None):
+    res = {
+        "id": f"/subscriptions/sub1/resourceGroups/rg1/providers/{type}/{name}",
+        "name": name, "type": type, "location": "eastus", "properties": {},
+    }
+    if sku:
+        res["sku"] = sku
+    return res
+
+@pytest.fixture(scope="module")
+def impact_levels():
+    resources = [
+        make_res("vm1", "Microsoft.Compute/virtualMachines"),
+        make_res("vmss1", "Microsoft.Compute/virtualMachineScaleSets"),
+        make_res("vm1/ext1", "Microsoft.Compute/virtualMachines/extensions"),
+        make_res("pip-basic", "Microsoft.Network/publicIPAddresses", sku={"name": "Basic"}),
+        make_res("pip-std", "Microsoft.Network/publicIPAddresses", sku={"name": "Standard"}),
+        make_res("pip-nosku", "Microsoft.Network/publicIPAddresses"),
+        make_res("sa1", "Microsoft.Storage/storageAccounts"),
+    ]
+    output = ReportService().generate_excel_report("job1", {"resources": resources}, {})
+    sheet = load_workbook(io.BytesIO(output.getvalue()), read_only=True)["Resource Impact"]
+    rows = sheet.iter_rows(values_only=True)
+    header = next(rows)
+    assert header[:3] == ("Resource Name", "Type", "Impact Level")
+    return {row[0]: row[2] for row in rows}
+
+@pytest.mark.parametrize("name, expected", [
+    ("vm1", "High"),
+    ("vmss1", "High"),
+    ("vm1/ext1", "High"),
+    ("pip-basic", "Critical"),
+    ("pip-std", "Minimal"),
+    ("pip-nosku", "Minimal"),
+    ("sa1", "Minimal"),
+])
+def test_impact_level(impact_levels, name, expected):
+    assert impact_levels[name] == expected
@@ -14,14 +14,22 @@ export default function JobPage() {
     const [planId, setPlanId] = useState<string | null>(null);
     const [exportingARM, setExportingARM] = useState(false);
 
-    // Poll Job Status
+    // Poll the lightweight status endpoint; fetch the full results once the job settles
     useEffect(() => {
-        // ... (Keep existing fetchJob logic)
         if (!id) return;
+        let interval: ReturnType<typeof setInterval> | undefined;
         const fetchJob = async () => {
             try {
-                const data = await api.getJobStatus(id);
-                setJob(data);
+                const status = await api.getJobStatus(id);
+                if (status.status === "COMPLETED" || status.status === "FAILED") {
+                    // Stop polling only once the full results are in; if this fetch
+                    // fails, the next tick retries it
+                    const full = await api.getJob(id);
+                    clearInterval(interval);
+                    setJob(full);
+                } else {
+                    setJob(status);
+                }
             } catch (err) {
                 console.error(err);
             } finally {
@@ -30,7 +38,7 @@ export default function JobPage() {
         };
 
         fetchJob();
-        const interval = setInterval(fetchJob, 3000);
+        interval = setInterval(fetchJob, 3000);
         return () => clearInterval(interval);
     }, [id]);
 
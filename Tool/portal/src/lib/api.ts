@@ -30,6 +30,8 @@ export interface AssessmentJob {
     created_at: string;
 }
 
+export type JobStatus = Pick<AssessmentJob, "id" | "tenant_id" | "status" | "created_at">;
+
 export interface MigrationPlan {
     id: string;
     job_id: string;
@@ -68,11 +70,16 @@ export const api = {
         return handleResponse(res);
     },
 
-    async getJobStatus(jobId: string): Promise<AssessmentJob> {
+    async getJobStatus(jobId: string): Promise<JobStatus> {
         const res = await fetch(`${API_URL}/api/v1/jobs/${jobId}`);
         return handleResponse(res);
     },
 
+    async getJob(jobId: string): Promise<AssessmentJob> {
+        const res = await fetch(`${API_URL}/api/v1/jobs/${jobId}/full`);
+        return handleResponse(res);
+    },
+
     async triggerMigration(jobId: string, sourceRg: string, targetRgId: string, resources: string[]): Promise<{ plan_id: string }> {
         const res = await fetch(`${API_URL}/api/v1/migrate`, {
             method: "POST",